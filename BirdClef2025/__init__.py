@@ -0,0 +1 @@
+# Shared helpers for the BirdCLEF 2025 scripts and viewers
@@ -0,0 +1,72 @@
+# Audio loading at the configured sample rate
+# Files are decoded with soundfile and only resampled when their native rate
+# differs from config.yaml's audio.sample_rate. The resampler is selectable:
+# 'polyphase' (scipy resample_poly) or one of the soxr qualities, 'soxr_hq'
+# being the librosa default. librosa is imported on first use only, since
+# importing it (numba, scipy, sklearn) costs more than decoding a file.
+
+from functools import lru_cache
+
+import numpy as np
+import soundfile as sf
+import soxr
+
+from .config import load_config
+
+RESAMPLERS = ('polyphase', 'soxr_lq', 'soxr_mq', 'soxr_hq', 'soxr_vhq')
+# Resamplers that have a stateful streaming form, with their soxr quality names
+STREAM_QUALITIES = {'soxr_lq': 'LQ', 'soxr_mq': 'MQ', 'soxr_hq': 'HQ', 'soxr_vhq': 'VHQ'}
+
+
+@lru_cache(maxsize=1)
+def default_audio_settings():
+    # (sample_rate, resampler) from config.yaml, read once per process
+    audio = load_config()['audio']
+    return int(audio['sample_rate']), audio.get('resampler', 'soxr_hq')
+
+
+def to_mono(block):
+    # (frames, channels) -> (frames,), averaging channels like librosa.to_mono
+    return block.mean(axis=1) if block.shape[1] > 1 else block[:, 0]
+
+
+def resample(y, orig_sr, target_sr, resampler=None):
+    if orig_sr == target_sr:
+        return y
+    resampler = resampler or default_audio_settings()[1]
+    if resampler not in RESAMPLERS:
+        raise ValueError(f'unknown resampler {resampler!r}, expected one of {RESAMPLERS}')
+    import librosa
+    y = librosa.resample(y, orig_sr=orig_sr, target_sr=target_sr, res_type=resampler)
+    return np.ascontiguousarray(y, dtype=np.float32)
+
+
+def load_audio(path, sr=None, resampler=None):
+    # Mono float32 signal at sr (default: the configured rate); sr=0 keeps the native rate
+    if sr is None:
+        sr = default_audio_settings()[0]
+    try:
+        block, native_sr = sf.read(path, dtype='float32', always_2d=True)
+        y = to_mono(block)
+    except sf.LibsndfileError:
+        # Formats libsndfile cannot read (e.g. mp3 on old builds) go through librosa's fallback
+        import librosa
+        y, native_sr = librosa.load(path, sr=None)
+    if not sr:
+        return y, native_sr
+    return resample(y, native_sr, sr, resampler), sr
+
+
+class StreamResampler:
+    """Chunked soxr resampling that keeps filter state across blocks."""
+
+    def __init__(self, orig_sr, target_sr, resampler=None):
+        # Same quality as resample() with this resampler (default: the configured one)
+        resampler = resampler or default_audio_settings()[1]
+        if resampler not in STREAM_QUALITIES:
+            raise ValueError(f'resampler {resampler!r} cannot stream, expected one of {tuple(STREAM_QUALITIES)}')
+        self._stream = soxr.ResampleStream(orig_sr, target_sr, 1, dtype='float32',
+                                           quality=STREAM_QUALITIES[resampler])
+
+    def __call__(self, block, last=False):
+        return self._stream.resample_chunk(np.ascontiguousarray(block, dtype=np.float32), last=last)
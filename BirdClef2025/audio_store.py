@@ -0,0 +1,129 @@
+# Memory-mapped waveform store for the train_audio corpus
+# Recordings are decoded once at the configured sample rate, quantized to
+# int16 (or float16) and appended to a ShardedStore under
+# paths.train_data/audio, keyed by the train.csv filename. Reads are memmap
+# slices: window() returns a zero-copy view of any time range, read()
+# converts just that range to float32. Half the bytes of float32 on disk
+# and in the page cache, and no OGG decoding after the first pass.
+#
+# Usage (from the project root):
+#   python -m BirdClef2025.audio_store --workers 8
+
+import argparse
+import os
+from functools import partial
+
+import numpy as np
+
+from .audio_io import default_audio_settings, load_audio
+from .config import PROJECT_ROOT, load_config, project_path
+from .store import MANIFEST, ShardedStore, add_build_arguments, build_store, source_key
+
+AUDIO_DTYPES = ('int16', 'float16')
+INT16_SCALE = 32767
+
+
+def default_audio_store_dir(config=None):
+    config = config or load_config()
+    return project_path(os.path.join(config['paths']['train_data'], 'audio'))
+
+
+def encode(y, dtype):
+    # float signal in [-1, 1] -> stored samples
+    if np.dtype(dtype) == np.int16:
+        return np.round(np.clip(y, -1.0, 1.0) * INT16_SCALE).astype(np.int16)
+    return np.asarray(y, dtype=dtype)
+
+
+def decode(samples):
+    # Stored samples -> float32 signal in [-1, 1]
+    if samples.dtype == np.int16:
+        return samples.astype(np.float32) * np.float32(1 / INT16_SCALE)
+    return samples.astype(np.float32)
+
+
+def transcode(audio_path, sample_rate, resampler, dtype):
+    # Runs in a worker process; returning the quantized signal halves what is pickled back.
+    # A file that fails comes back as its exception so one bad recording does not abort the run
+    try:
+        y, _ = load_audio(audio_path, sr=sample_rate, resampler=resampler)
+        return encode(y, dtype)
+    except Exception as e:
+        return e
+
+
+class AudioStore:
+    """Waveforms by train.csv filename, read from memory-mapped shards."""
+
+    def __init__(self, root=None, audio_dir=None, dtype='int16', params=None):
+        self.audio_dir = os.path.abspath(audio_dir or os.path.join(PROJECT_ROOT, 'rawdata', 'train_audio'))
+        # params=None opens whatever the store holds; writers pass theirs so stale entries are dropped
+        self.store = ShardedStore(root or default_audio_store_dir(), params=params, dtype=dtype)
+
+    @property
+    def sample_rate(self):
+        return self.store.params['sample_rate']
+
+    def __contains__(self, filename):
+        return filename in self.store
+
+    def __len__(self):
+        return len(self.store)
+
+    def key(self, audio_path):
+        # train.csv filename of a path under audio_dir, or None for files outside it
+        return source_key(audio_path, self.audio_dir)
+
+    def window(self, filename, offset=0.0, duration=None):
+        # Zero-copy view of the stored samples from offset for duration seconds (None = to the end)
+        start = int(round(offset * self.sample_rate))
+        stop = None if duration is None else start + int(round(duration * self.sample_rate))
+        return self.store.get(filename, start, stop)
+
+    def read(self, filename, offset=0.0, duration=None):
+        # Float32 signal of a window, like load_audio at the store's sample rate
+        return decode(self.window(filename, offset, duration))
+
+    def load(self, audio_path, sr=None):
+        # Float32 signal of a source file if it is stored, up to date and at rate sr, else None
+        key = self.key(audio_path)
+        if key is None or (sr is not None and sr != self.sample_rate):
+            return None
+        if key not in self.store or not self.store.is_current(key, audio_path):
+            return None
+        return self.read(key)
+
+
+def default_audio_store(config=None):
+    # The transcoded corpus if one has been built, else None so callers decode as before
+    root = default_audio_store_dir(config)
+    if not os.path.exists(os.path.join(root, MANIFEST)):
+        return None
+    return AudioStore(root)
+
+
+def main():
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description='Transcode rawdata/train_audio into a memory-mapped store')
+    add_build_arguments(parser, '<paths.train_data>/audio')
+    parser.add_argument('--dtype', default='int16', choices=AUDIO_DTYPES)
+    args = parser.parse_args()
+
+    sample_rate, resampler = default_audio_settings()
+    audio_store = AudioStore(args.out, audio_dir=args.audio_dir, dtype=args.dtype,
+                             params={'sample_rate': sample_rate, 'resampler': resampler})
+    store = audio_store.store
+    store.shard_bytes = args.shard_mb * 1024 ** 2
+
+    filenames = pd.read_csv(args.train_csv, usecols=['filename'])['filename'].tolist()
+    build_store(store, filenames, args.audio_dir,
+                partial(transcode, sample_rate=sample_rate, resampler=resampler, dtype=store.dtype),
+                'transcode', workers=args.workers)
+    hours = sum(entry['length'] for entry in store.entries.values()) / sample_rate / 3600
+    print(f'Store at {store.root}: {len(store)} recordings, {hours:.1f} h of audio '
+          f'in {len(store.manifest["shards"])} shards')
+
+
+if __name__ == "__main__":
+    main()
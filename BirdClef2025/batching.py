@@ -0,0 +1,98 @@
+# Batched chunk inference
+# Soundscapes are cut into 5-second chunks as strided views (only the final
+# short chunk is copied and zero-padded), and chunks from several soundscapes
+# are packed into fixed-size batches for a pluggable predict_batch callable.
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+
+def chunk_signal(sig, chunk_len):
+    # Returns (full, tail): a read-only (n_full, chunk_len) view over sig and the
+    # zero-padded final short chunk, or None when sig divides evenly
+    sig = np.asarray(sig)
+    n_full = len(sig) // chunk_len
+    full = as_strided(sig, shape=(n_full, chunk_len) + sig.shape[1:],
+                      strides=(sig.strides[0] * chunk_len,) + sig.strides, writeable=False)
+    tail = None
+    rest = len(sig) - n_full * chunk_len
+    if rest:
+        tail = np.zeros((1, chunk_len) + sig.shape[1:], dtype=sig.dtype)
+        tail[0, :rest] = sig[n_full * chunk_len:]
+    return full, tail
+
+
+class Batch:
+    """A fixed-size batch plus the (key, first_chunk, count) segments it holds."""
+
+    def __init__(self, data, segments, n_valid):
+        self.data = data
+        self.segments = segments
+        self.n_valid = n_valid
+
+
+class ChunkBatcher:
+    """Packs chunk arrays from many sources into fixed-size batches."""
+
+    def __init__(self, batch_size, chunk_shape, dtype=np.float32):
+        self.batch_size = batch_size
+        self.chunk_shape = tuple(chunk_shape)
+        self.dtype = dtype
+        self._new_batch()
+
+    def _new_batch(self):
+        # A fresh buffer per batch so a yielded batch is never overwritten
+        self._data = np.zeros((self.batch_size,) + self.chunk_shape, dtype=self.dtype)
+        self._segments = []
+        self._n = 0
+
+    def _take(self):
+        batch = Batch(self._data, self._segments, self._n)
+        self._new_batch()
+        return batch
+
+    def add(self, key, chunks, first_chunk=0):
+        # Copy chunks (an array or a chunk_signal() pair) into the current batch,
+        # yielding every batch that fills up on the way
+        parts = [p for p in (chunks if isinstance(chunks, tuple) else (chunks,)) if p is not None]
+        for part in parts:
+            if part.shape[1:] != self.chunk_shape:
+                raise ValueError(f'{key}: chunk shape {part.shape[1:]} does not match batch shape {self.chunk_shape}')
+            pos = 0
+            while pos < len(part):
+                take = min(len(part) - pos, self.batch_size - self._n)
+                self._data[self._n:self._n + take] = part[pos:pos + take]
+                if self._segments and self._segments[-1][0] == key \
+                        and sum(self._segments[-1][1:]) == first_chunk + pos:
+                    k, start, count = self._segments[-1]
+                    self._segments[-1] = (k, start, count + take)
+                else:
+                    self._segments.append((key, first_chunk + pos, take))
+                self._n += take
+                pos += take
+                if self._n == self.batch_size:
+                    yield self._take()
+            first_chunk += len(part)
+
+    def flush(self):
+        # Final partial batch; rows past n_valid are zeros
+        if self._n:
+            yield self._take()
+
+
+def score_batches(batches, predict_batch, on_scores):
+    # Run predict_batch on each batch and hand the valid rows back per segment
+    for batch in batches:
+        scores = np.asarray(predict_batch(batch.data))
+        row = 0
+        for key, first_chunk, count in batch.segments:
+            on_scores(key, scores[row:row + count], first_chunk)
+            row += count
+
+
+def batch_soundscapes(soundscape_chunks, batch_size, chunk_shape, dtype=np.float32):
+    # soundscape_chunks yields (key, chunks); yields fixed-size Batch objects
+    batcher = ChunkBatcher(batch_size, chunk_shape, dtype)
+    for key, chunks in soundscape_chunks:
+        yield from batcher.add(key, chunks)
+    yield from batcher.flush()
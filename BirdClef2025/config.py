@@ -0,0 +1,23 @@
+# Access to config/config.yaml
+
+import os
+import yaml
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_PATH = os.path.join(PROJECT_ROOT, 'config', 'config.yaml')
+
+
+def load_config(path=CONFIG_PATH):
+    with open(path) as f:
+        return yaml.safe_load(f)
+
+
+def audio_params(config=None):
+    # Feature parameters that decide what a cached spectrogram looks like
+    audio = (config or load_config())['audio']
+    return {key: int(audio[key]) for key in ('sample_rate', 'n_mels', 'hop_length', 'n_fft')}
+
+
+def project_path(relative_path):
+    # Config paths are relative to the project root
+    return os.path.join(PROJECT_ROOT, relative_path)
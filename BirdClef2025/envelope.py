@@ -0,0 +1,83 @@
+# Level-of-detail waveform rendering
+# A min/max envelope pyramid is built once per recording; plots then draw
+# about two points per horizontal pixel from the coarsest level that still
+# resolves the visible time range, and refine it when the x limits change.
+# Draw cost no longer depends on recording length.
+
+import numpy as np
+
+
+class EnvelopePyramid:
+    """Per-block min/max of a waveform at successively halved resolutions."""
+
+    def __init__(self, y, sr, base_block=16, min_blocks=256):
+        self.y = np.asarray(y)
+        self.sr = sr
+        # Largest absolute sample, for symmetric y limits; found once so plot() never scans y
+        self.peak = None
+        if len(self.y):
+            self.peak = max(float(np.abs(self.y.min())), float(np.abs(self.y.max())), 1e-6)
+        # levels[i] = (block size in samples, mins, maxs)
+        self.levels = []
+        block = base_block
+        n = len(self.y) // block
+        if n:
+            blocks = self.y[:n * block].reshape(n, block)
+            lo, hi = blocks.min(axis=1), blocks.max(axis=1)
+            self.levels.append((block, lo, hi))
+            while len(lo) > min_blocks:
+                n = len(lo) // 2
+                lo = np.minimum(lo[:2 * n:2], lo[1:2 * n:2])
+                hi = np.maximum(hi[:2 * n:2], hi[1:2 * n:2])
+                block *= 2
+                self.levels.append((block, lo, hi))
+
+    @property
+    def duration(self):
+        return len(self.y) / self.sr
+
+    @property
+    def nbytes(self):
+        return self.y.nbytes + sum(lo.nbytes + hi.nbytes for _, lo, hi in self.levels)
+
+    def view(self, t0, t1, n_points):
+        # (t, values) for [t0, t1] with at most about 2 * n_points points
+        start = max(int(np.floor(t0 * self.sr)), 0)
+        stop = min(int(np.ceil(t1 * self.sr)) + 1, len(self.y))
+        if stop <= start:
+            return np.empty(0), np.empty(0)
+        if stop - start <= 2 * n_points or not self.levels:
+            return np.arange(start, stop) / self.sr, self.y[start:stop]
+
+        # Coarsest level with at least n_points blocks across the view
+        block, lo, hi = self.levels[0]
+        for level in self.levels:
+            if (stop - start) / level[0] < n_points:
+                break
+            block, lo, hi = level
+        first, last = start // block, min(-(-stop // block), len(lo))
+        # Each block becomes a vertical min-max stroke at its centre
+        t = (np.arange(first, last) + 0.5) * block / self.sr
+        values = np.empty(2 * (last - first), dtype=lo.dtype)
+        values[0::2] = lo[first:last]
+        values[1::2] = hi[first:last]
+        return np.repeat(t, 2), values
+
+    def plot(self, ax, line=None, **kwargs):
+        # Draw into ax (or into an existing line) and keep refining the envelope
+        # as the x limits change; returns the callback id to disconnect later
+        n_points = max(int(ax.bbox.width), 200)
+        t, values = self.view(0, self.duration, n_points)
+        if line is None:
+            line, = ax.plot(t, values, linewidth=0.8, **kwargs)
+        else:
+            line.set_data(t, values)
+        ax.set_xlim(0, self.duration)
+        if self.peak is not None:
+            ax.set_ylim(-1.05 * self.peak, 1.05 * self.peak)
+
+        def refine(ax):
+            t0, t1 = ax.get_xlim()
+            line.set_data(*self.view(t0, t1, max(int(ax.bbox.width), 200)))
+
+        return ax.callbacks.connect('xlim_changed', refine)
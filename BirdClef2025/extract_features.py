@@ -0,0 +1,83 @@
+# Offline mel spectrogram extraction for the whole train_audio corpus
+# Walks rawdata/train.csv, computes mel spectrograms with the config.yaml
+# audio parameters on all cores and appends them to a sharded store under
+# paths.train_data. Files already in the store and unchanged are skipped,
+# so an interrupted run picks up where it stopped. FeatureCache reads the
+# store through MelStore, so the viewers and thumbnails of train_audio
+# recordings never decode a file the extraction already handled.
+#
+# Usage (from the project root):
+#   python -m BirdClef2025.extract_features --workers 8
+
+import argparse
+import os
+from functools import partial
+
+from .audio_io import load_audio
+from .config import PROJECT_ROOT, audio_params, load_config, project_path
+from .feature_cache import mel_db
+from .store import MANIFEST, ShardedStore, add_build_arguments, build_store, source_key
+
+
+def default_mel_store_dir(config=None):
+    config = config or load_config()
+    return project_path(os.path.join(config['paths']['train_data'], 'mel'))
+
+
+def extract_mel(audio_path, params):
+    # Runs in a worker process; a file that fails comes back as its exception
+    # so one bad recording does not abort the run
+    try:
+        y, _ = load_audio(audio_path, sr=params['sample_rate'])
+        return mel_db(y, params)
+    except Exception as e:
+        return e
+
+
+class MelStore:
+    """Mel spectrograms by train.csv filename, read from memory-mapped shards."""
+
+    def __init__(self, root=None, audio_dir=None, dtype=None, params=None):
+        self.audio_dir = os.path.abspath(audio_dir or os.path.join(PROJECT_ROOT, 'rawdata', 'train_audio'))
+        # params=None opens whatever the store holds; the CLI passes its own so stale entries are dropped
+        self.store = ShardedStore(root or default_mel_store_dir(), params=params, dtype=dtype)
+
+    def load(self, audio_path, params):
+        # Memmap view of a source file's mel if it is stored, up to date and made with params, else None
+        key = source_key(audio_path, self.audio_dir)
+        if key is None or self.store.params != params:
+            return None
+        if key not in self.store or not self.store.is_current(key, audio_path):
+            return None
+        return self.store.get(key)
+
+
+def default_mel_store(config=None):
+    # The extracted corpus if one has been built, else None so FeatureCache computes as before
+    root = default_mel_store_dir(config)
+    if not os.path.exists(os.path.join(root, MANIFEST)):
+        return None
+    return MelStore(root)
+
+
+def main():
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description='Precompute mel spectrograms for rawdata/train_audio')
+    add_build_arguments(parser, '<paths.train_data>/mel')
+    parser.add_argument('--dtype', default=None, choices=['float16', 'float32'],
+                        help='stored dtype (default: keep the existing store\'s, float16 for a new one)')
+    args = parser.parse_args()
+
+    mel_store = MelStore(args.out, audio_dir=args.audio_dir, dtype=args.dtype, params=audio_params())
+    store = mel_store.store
+    store.shard_bytes = args.shard_mb * 1024 ** 2
+
+    filenames = pd.read_csv(args.train_csv, usecols=['filename'])['filename'].tolist()
+    build_store(store, filenames, args.audio_dir, partial(extract_mel, params=store.params), 'extract',
+                workers=args.workers)
+    print(f'Store at {store.root}: {len(store)} recordings in {len(store.manifest["shards"])} shards')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# Persistent on-disk feature cache
+# Features are stored as .npy files named by a hash of the audio file path,
+# its mtime and size, and the audio parameters from config/config.yaml, so a
+# changed file or changed parameters simply miss. Cached arrays are opened
+# memory-mapped and a warm start does not decode any audio. With a MelStore
+# from the offline extraction, mel_db misses are served from its shards; with
+# an AudioStore, other misses read the transcoded waveform instead of decoding OGG.
+
+import hashlib
+import json
+import os
+import threading
+import numpy as np
+
+from .audio_io import load_audio
+from .batching import chunk_signal
+from .config import audio_params, load_config, project_path
+from .features import FeatureEngine
+from .thumbnails import THUMBNAIL_SIZE, render_thumbnail
+
+
+def mel_db(y, params):
+    return FeatureEngine.from_params(params).mel_db(y)
+
+
+def compute_features(y, params, names):
+    # Every cached feature comes from the same single STFT
+    spectra = FeatureEngine.from_params(params).features(y)
+    available = {
+        'mel_db': lambda: spectra['mel_db'],
+        # Magnitude spectrum averaged over time, all the magnitude plot needs
+        'magnitude': lambda: np.mean(spectra['magnitude'], axis=-1),
+    }
+    return {name: available[name]() for name in names}
+
+
+# Names of the features FeatureCache can store
+FEATURES = ('mel_db', 'magnitude')
+
+
+def default_cache_dir(config=None):
+    config = config or load_config()
+    return project_path(os.path.join(config['paths']['processed_data'], 'feature_cache'))
+
+
+class FeatureCache:
+    """Content-addressed .npy cache of per-file features."""
+
+    def __init__(self, cache_dir=None, params=None, dtype=np.float16, audio_store=None, mel_store=None):
+        config = load_config() if cache_dir is None or params is None else None
+        self.cache_dir = cache_dir or default_cache_dir(config)
+        self.params = params or audio_params(config)
+        self.dtype = np.dtype(dtype)
+        self.audio_store = audio_store
+        self.mel_store = mel_store
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def key(self, audio_path, name):
+        stat = os.stat(audio_path)
+        ident = json.dumps([os.path.abspath(audio_path), stat.st_mtime_ns, stat.st_size,
+                            name, self.params, self.dtype.str], sort_keys=True)
+        return hashlib.sha1(ident.encode()).hexdigest()
+
+    def cache_path(self, audio_path, name):
+        key = self.key(audio_path, name)
+        return os.path.join(self.cache_dir, key[:2], key + '.npy')
+
+    def load_audio(self, audio_path):
+        if self.audio_store is not None:
+            y = self.audio_store.load(audio_path, sr=self.params['sample_rate'])
+            if y is not None:
+                return y
+        return load_audio(audio_path, sr=self.params['sample_rate'])[0]
+
+    def stored_mel(self, audio_path):
+        # mel_db from the offline extraction store if it holds this file with our parameters, else None
+        if self.mel_store is None:
+            return None
+        mel = self.mel_store.load(audio_path, self.params)
+        return None if mel is None else mel.astype(self.dtype, copy=False)
+
+    def get(self, audio_path, names=('mel_db',), y=None):
+        # Returns {name: array}; hits are memory-mapped, misses share one decode and one STFT
+        result = {}
+        missing = []
+        for name in names:
+            if name not in FEATURES:
+                raise KeyError(f'unknown feature {name!r}, expected one of {FEATURES}')
+            path = self.cache_path(audio_path, name)
+            if os.path.exists(path):
+                result[name] = np.load(path, mmap_mode='r')
+                continue
+            if name == 'mel_db':
+                stored = self.stored_mel(audio_path)
+                if stored is not None:
+                    result[name] = stored
+                    continue
+            missing.append(name)
+        if missing:
+            if y is None:
+                y = self.load_audio(audio_path)
+            for name, array in compute_features(y, self.params, missing).items():
+                result[name] = self._save(self.cache_path(audio_path, name), array.astype(self.dtype))
+        return result
+
+    def _save(self, path, array):
+        # Write to a temp file first so readers never see a partial .npy
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.save(f, array)
+        os.replace(tmp_path, path)
+        return array
+
+    def thumbnail(self, audio_path, size=THUMBNAIL_SIZE):
+        # (height, width, 3) uint8 gallery tile, rendered from the cached mel spectrogram once
+        path = self.cache_path(audio_path, 'thumbnail_%dx%d' % size)
+        if os.path.exists(path):
+            return np.load(path)
+        return self._save(path, render_thumbnail(self.get(audio_path)['mel_db'], size))
+
+    def mel_chunks(self, audio_path, chunk_seconds=5):
+        # Mel spectrograms of a soundscape's 5-second chunks as (n_chunks, n_mels, frames),
+        # computed per chunk exactly like FeatureEngine.mel_db(batch) on the audio chunks,
+        # so 'mel' and 'audio' model inputs see the same features; the last chunk is zero-padded
+        path = self.cache_path(audio_path, 'mel_chunks_%ds' % chunk_seconds)
+        if os.path.exists(path):
+            return np.load(path).astype(np.float32)
+        engine = FeatureEngine.from_params(self.params)
+        chunks = chunk_signal(self.load_audio(audio_path), self.params['sample_rate'] * chunk_seconds)
+        mel = np.concatenate([engine.mel_db(part) for part in chunks if part is not None and len(part)])
+        return self._save(path, mel.astype(self.dtype)).astype(np.float32)
@@ -0,0 +1,129 @@
+# Vectorized STFT / mel feature engine
+# One STFT per signal gives the magnitude spectrum, power mel and dB mel.
+# The mel filterbank and window are cached per parameter set instead of being
+# rebuilt for every call, and a 2-D (batch, samples) array of equal-length
+# chunks runs through vectorized rfft and matmul calls, a few signals at a
+# time so the windowed frames stay cache-sized. Output matches
+# librosa.feature.melspectrogram / power_to_db(ref=np.max) with the
+# librosa defaults (hann window, center=True, zero padding). librosa itself is
+# only imported when a filterbank is first built; mel_frequencies() is plain
+# numpy so the viewers can label mel axes without importing it.
+
+from functools import lru_cache
+
+import numpy as np
+import scipy.fft
+from numpy.lib.stride_tricks import as_strided
+
+
+# Slaney mel scale (librosa's default, htk=False): linear below 1 kHz, logarithmic above
+MEL_LINEAR_HZ = 200.0 / 3
+MEL_LOG_HZ = 1000.0
+MEL_LOG_MEL = MEL_LOG_HZ / MEL_LINEAR_HZ
+MEL_LOG_STEP = np.log(6.4) / 27.0
+
+
+def hz_to_mel(hz):
+    hz = np.asarray(hz, dtype=np.float64)
+    log_part = MEL_LOG_MEL + np.log(np.maximum(hz, MEL_LOG_HZ) / MEL_LOG_HZ) / MEL_LOG_STEP
+    return np.where(hz >= MEL_LOG_HZ, log_part, hz / MEL_LINEAR_HZ)
+
+
+def mel_to_hz(mels):
+    mels = np.asarray(mels, dtype=np.float64)
+    return np.where(mels >= MEL_LOG_MEL, MEL_LOG_HZ * np.exp(MEL_LOG_STEP * (mels - MEL_LOG_MEL)),
+                    mels * MEL_LINEAR_HZ)
+
+
+def mel_frequencies(n_mels=128, fmin=0.0, fmax=11025.0):
+    # Centre frequencies in Hz of n_mels bins, matching librosa.mel_frequencies
+    return mel_to_hz(np.linspace(hz_to_mel(fmin), hz_to_mel(fmax), n_mels))
+
+
+@lru_cache(maxsize=16)
+def mel_basis(sr, n_fft, n_mels):
+    import librosa
+    basis = librosa.filters.mel(sr=sr, n_fft=n_fft, n_mels=n_mels).astype(np.float32)
+    basis.flags.writeable = False
+    return basis
+
+
+@lru_cache(maxsize=16)
+def hann_window(n_fft):
+    import librosa
+    window = librosa.filters.get_window('hann', n_fft, fftbins=True).astype(np.float32)
+    window.flags.writeable = False
+    return window
+
+
+def power_to_db(S, amin=1e-10, top_db=80.0):
+    # librosa.power_to_db(S, ref=np.max) applied per signal over the last two axes
+    log_spec = 10.0 * np.log10(np.maximum(S, amin))
+    ref = np.max(log_spec, axis=(-2, -1), keepdims=True)
+    log_spec = log_spec - np.maximum(ref, 10.0 * np.log10(amin))
+    if top_db is not None:
+        log_spec = np.maximum(log_spec, np.max(log_spec, axis=(-2, -1), keepdims=True) - top_db)
+    return log_spec
+
+
+class FeatureEngine:
+    """Spectral features for one signal (n,) or a batch (batch, n) of equal-length signals."""
+
+    def __init__(self, sr, n_fft=2048, hop_length=512, n_mels=128, block_size=8):
+        self.sr = sr
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.n_mels = n_mels
+        # Signals per rfft call when given a batch
+        self.block_size = block_size
+
+    @classmethod
+    def from_params(cls, params):
+        # params as returned by config.audio_params()
+        return cls(params['sample_rate'], params['n_fft'], params['hop_length'], params['n_mels'])
+
+    @property
+    def mel_basis(self):
+        return mel_basis(self.sr, self.n_fft, self.n_mels)
+
+    def frames(self, y):
+        # Centered, zero-padded frames as a strided view: (..., n_frames, n_fft)
+        y = np.asarray(y, dtype=np.float32)
+        pad = [(0, 0)] * (y.ndim - 1) + [(self.n_fft // 2, self.n_fft // 2)]
+        y = np.ascontiguousarray(np.pad(y, pad))
+        n_frames = 1 + (y.shape[-1] - self.n_fft) // self.hop_length
+        step = y.strides[-1]
+        return as_strided(y, shape=y.shape[:-1] + (n_frames, self.n_fft),
+                          strides=y.strides[:-1] + (step * self.hop_length, step), writeable=False)
+
+    def _blocks(self, y, transform):
+        # Apply transform to |STFT| blocks of a batch and stack the results;
+        # a 1-D signal is a batch of one
+        frames = self.frames(y)
+        batch = frames.reshape((-1,) + frames.shape[-2:])
+        window = hann_window(self.n_fft)
+        out = None
+        for start in range(0, len(batch), self.block_size):
+            spectrum = scipy.fft.rfft(batch[start:start + self.block_size] * window, axis=-1, workers=-1)
+            result = transform(np.abs(spectrum).swapaxes(-1, -2))
+            if out is None:
+                out = np.empty((len(batch),) + result.shape[1:], dtype=np.float32)
+            out[start:start + len(result)] = result
+        return out.reshape(frames.shape[:-2] + out.shape[1:])
+
+    def magnitude(self, y):
+        # |STFT| as (..., 1 + n_fft // 2, n_frames)
+        return self._blocks(y, lambda magnitude: magnitude)
+
+    def mel_power(self, magnitude):
+        return np.matmul(self.mel_basis, magnitude ** 2)
+
+    def features(self, y):
+        # All features from a single STFT
+        magnitude = self.magnitude(y)
+        mel_power = self.mel_power(magnitude)
+        return {'magnitude': magnitude, 'mel_power': mel_power, 'mel_db': power_to_db(mel_power)}
+
+    def mel_db(self, y):
+        # Mel only, without keeping the full magnitude spectrum around
+        return power_to_db(self._blocks(y, self.mel_power))
@@ -0,0 +1,182 @@
+# Reusable matplotlib canvases for the Tk viewers
+# Each FigureSlot owns one Figure and FigureCanvasTkAgg for the lifetime of
+# the window. New recordings update the existing image or line in place, so
+# no figures pile up in pyplot's registry. When only the data changes, the
+# animated artist is blitted over a saved background. Axes, ticks and the
+# colorbar are redrawn only when limits or colour scale change; the title is
+# animated too, so a new recording name alone is blitted.
+# With master=None the slot renders off-screen on an Agg canvas, which the
+# benchmarks use to time the viewer drawing path without a display.
+
+import tkinter as tk
+from matplotlib.figure import Figure
+from matplotlib.ticker import FuncFormatter
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+
+from .features import mel_frequencies
+
+
+class FigureSlot:
+    """One persistent figure with a placeholder label and a play button."""
+
+    def __init__(self, master, figsize=(9, 5), on_play=None, toolbar=False):
+        # Plain Figure objects are not registered with pyplot, so nothing leaks
+        self.figure = Figure(figsize=figsize)
+        self.ax = self.figure.add_subplot()
+        self.ax.tick_params(axis='both', which='major', labelsize=8)
+        # The title changes with every recording, so it is drawn like the data and
+        # a new title alone does not force a full redraw
+        self.ax.title.set_animated(True)
+
+        self.on_play = on_play
+        self.audio_path = None
+        self.toolbar = None
+        if master is None:
+            self.frame = None
+            self.canvas = FigureCanvasAgg(self.figure)
+        else:
+            self.frame = tk.Frame(master)
+            self.attach()
+            self.placeholder = tk.Label(self.frame, width=80, height=12)
+            self.canvas = FigureCanvasTkAgg(self.figure, master=self.frame)
+            self.play_button = tk.Button(self.frame, text="Play Audio", command=self._play)
+            if toolbar:
+                # Zoom and pan; envelope plots refine themselves on the new x limits
+                self.toolbar = NavigationToolbar2Tk(self.canvas, self.frame, pack_toolbar=False)
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+
+        self.image = None
+        self.colorbar = None
+        self.line = None
+        self._callbacks = []
+        self._background = None
+        self._background_limits = None
+        self._layout = None
+        self._visible = False
+
+    def _play(self):
+        if self.on_play and self.audio_path:
+            self.on_play(self.audio_path)
+
+    def _animated(self):
+        return [artist for artist in (self.image, self.line, self.ax.title) if artist is not None]
+
+    def _on_draw(self, event):
+        # Full redraws skip animated artists; save the background, then draw them on top
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._background_limits = self._limits()
+        for artist in self._animated():
+            self.figure.draw_artist(artist)
+
+    def _limits(self):
+        return self.ax.get_xlim(), self.ax.get_ylim()
+
+    def _refresh(self, layout):
+        # Blit when only data changed, otherwise redraw ticks, labels and colorbar.
+        # The background must also match the current limits, which a toolbar zoom changes
+        if layout != self._layout or self._background is None or self._background_limits != self._limits():
+            self._layout = layout
+            self.canvas.draw_idle()
+        else:
+            self.canvas.restore_region(self._background)
+            for artist in self._animated():
+                self.figure.draw_artist(artist)
+            self.canvas.blit(self.figure.bbox)
+
+    def loading(self, text):
+        if self.frame is None:
+            return
+        self.canvas.get_tk_widget().pack_forget()
+        self.play_button.pack_forget()
+        if self.toolbar is not None:
+            self.toolbar.pack_forget()
+        self.placeholder.config(text=text)
+        self.placeholder.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self._visible = False
+
+    def _show(self, audio_path):
+        self.audio_path = audio_path
+        if self.toolbar is not None:
+            # New data: the toolbar's home view is the one about to be drawn
+            self.toolbar.update()
+        if self.frame is not None and not self._visible:
+            self.placeholder.pack_forget()
+            if self.toolbar is not None:
+                self.toolbar.pack(side=tk.BOTTOM, fill=tk.X)
+            self.canvas.get_tk_widget().pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+            self.play_button.pack(side=tk.RIGHT, padx=10)
+            self._visible = True
+
+    def attach(self):
+        if self.frame is not None:
+            self.frame.pack(fill=tk.X, pady=15)
+
+    def hide(self):
+        if self.frame is not None:
+            self.frame.pack_forget()
+
+    def _disconnect(self):
+        for cid in self._callbacks:
+            self.ax.callbacks.disconnect(cid)
+        self._callbacks = []
+
+    def show_mel(self, S_dB, sr, hop_length, title, audio_path=None):
+        # Mel spectrogram as an imshow image whose data and extent are updated in place
+        self._disconnect()
+        n_mels, n_frames = S_dB.shape
+        extent = (0, n_frames * hop_length / sr, 0, n_mels)
+        clim = (float(S_dB.min()), float(S_dB.max()))
+        if self.image is None:
+            self.image = self.ax.imshow(S_dB, aspect='auto', origin='lower', interpolation='nearest',
+                                        extent=extent, cmap='magma', animated=True)
+            self.colorbar = self.figure.colorbar(self.image, ax=self.ax, format='%+2.0f dB')
+            self.ax.set_xlabel('Time (seconds)', fontsize=10, labelpad=10)
+            self.ax.set_ylabel('Mel Frequency', fontsize=10, labelpad=10)
+        else:
+            self.image.set_data(S_dB)
+            self.image.set_extent(extent)
+        self.image.set_clim(*clim)
+
+        # Label mel bins with their centre frequency in Hz
+        mel_hz = mel_frequencies(n_mels=n_mels, fmax=sr / 2)
+        self.ax.yaxis.set_major_formatter(FuncFormatter(
+            lambda v, pos: f'{mel_hz[min(max(int(v), 0), n_mels - 1)]:.0f}'))
+        self.ax.set_xlim(extent[0], extent[1])
+        self.ax.set_ylim(extent[2], extent[3])
+        self.ax.set_title(title, pad=20)
+        if self._layout is None:
+            self.figure.tight_layout()
+        self._show(audio_path)
+        self._refresh(('mel', extent, clim))
+
+    def show_line(self, x, y, title, xlabel, ylabel, audio_path=None):
+        # Line plot whose data is replaced in place
+        self._disconnect()
+        if self.line is None:
+            self.line, = self.ax.plot(x, y, linewidth=0.8, animated=True)
+            self.ax.set_xlabel(xlabel, fontsize=10, labelpad=10)
+            self.ax.set_ylabel(ylabel, fontsize=10, labelpad=10)
+        else:
+            self.line.set_data(x, y)
+        self.ax.relim()
+        self.ax.autoscale_view()
+        self.ax.set_title(title, pad=20)
+        if self._layout is None:
+            self.figure.tight_layout()
+        self._show(audio_path)
+        self._refresh(('line', self.ax.get_xlim(), self.ax.get_ylim()))
+
+    def show_envelope(self, envelope, title, audio_path=None):
+        # Waveform drawn from an EnvelopePyramid, refined when the x limits change
+        self._disconnect()
+        if self.line is None:
+            self.line, = self.ax.plot([], [], linewidth=0.8, animated=True)
+            self.ax.set_xlabel('Time (seconds)', fontsize=10, labelpad=10)
+            self.ax.set_ylabel('Amplitude', fontsize=10, labelpad=10)
+        self._callbacks.append(envelope.plot(self.ax, line=self.line))
+        self.ax.set_title(title, pad=20)
+        if self._layout is None:
+            self.figure.tight_layout()
+        self._show(audio_path)
+        self._refresh(('envelope', self.ax.get_xlim(), self.ax.get_ylim()))
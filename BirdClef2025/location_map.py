@@ -0,0 +1,150 @@
+# Builders for the recording location map (Explore/locationmap.py)
+# 'markers' is the original one CircleMarker per row loop. 'fast' ships the
+# points and their popup field values as one data array in a FastMarkerCluster
+# layer whose callback builds the same popup HTML in the browser, so the page
+# holds one JSON list instead of a JavaScript block and HTML string per marker.
+# 'grid' aggregates recordings into lat/lon cells per collection and draws one
+# sized marker per cell.
+
+import json
+
+import numpy as np
+import pandas as pd
+import folium
+from folium.plugins import FastMarkerCluster, MarkerCluster
+
+# Define colors for different collections
+COLLECTION_COLORS = {
+    'CSA': 'red',
+    'SSW': 'blue',
+    'ML': 'green',
+    'XC': 'purple',
+    'EBIRD': 'orange',
+    'OTHERS': 'gray'
+}
+
+MODES = ('markers', 'fast', 'grid')
+
+
+def base_map(df):
+    # Create a map centered at the mean of all coordinates
+    return folium.Map(location=[df['latitude'].mean(), df['longitude'].mean()], zoom_start=2)
+
+
+def add_markers_loop(m, df):
+    # Add markers for each location
+    marker_cluster = MarkerCluster().add_to(m)
+    for idx, row in df.iterrows():
+        # Get color based on collection
+        color = COLLECTION_COLORS.get(row['collection'], 'gray')
+        
+        # Create popup content
+        popup_content = f"""
+        <div style='font-family: Arial, sans-serif;'>
+            <h3 style='margin: 0 0 10px 0;'>{row['common_name']}</h3>
+            <p style='margin: 5px 0;'><b>Scientific Name:</b> {row['scientific_name']}</p>
+            <p style='margin: 5px 0;'><b>Collection:</b> {row['collection']}</p>
+            <p style='margin: 5px 0;'><b>Location:</b> {row['latitude']:.4f}°N, {row['longitude']:.4f}°E</p>
+            <p style='margin: 5px 0;'><b>Author:</b> {row['author']}</p>
+            <p style='margin: 5px 0;'><b>License:</b> {row['license']}</p>
+            <p style='margin: 5px 0;'><b>Date:</b> {row.get('date', 'N/A')}</p>
+            <p style='margin: 5px 0;'><b>Time:</b> {row.get('time', 'N/A')}</p>
+            <p style='margin: 5px 0;'><b>Rating:</b> {row.get('rating', 'N/A')}</p>
+            <p style='margin: 5px 0;'><b>Type:</b> {row.get('type', 'N/A')}</p>
+        </div>
+        """
+        
+        folium.CircleMarker(
+            location=[row['latitude'], row['longitude']],
+            radius=5,
+            popup=folium.Popup(popup_content, max_width=300),
+            color=color,
+            fill=True,
+            fill_color=color,
+            fill_opacity=0.7
+        ).add_to(marker_cluster)
+    return m
+
+
+# Popup lines after the common name heading, in the loop's order; None is the location line
+POPUP_FIELDS = [('Scientific Name', 'scientific_name'), ('Collection', 'collection'), ('Location', None),
+                ('Author', 'author'), ('License', 'license'), ('Date', 'date'), ('Time', 'time'),
+                ('Rating', 'rating'), ('Type', 'type')]
+POPUP_COLUMNS = ['common_name'] + [column for _, column in POPUP_FIELDS if column]
+
+
+def fast_marker_callback(columns):
+    # Leaflet callback turning one [lat, lon, *columns] data row into a marker. The popup
+    # HTML is the loop's, assembled in the browser, so the page carries each field value
+    # once instead of a full HTML string per point; missing columns read 'N/A'
+    def value(column):
+        return f'row[{2 + columns.index(column)}]' if column in columns else json.dumps('N/A')
+
+    p = "<p style='margin: 5px 0;'><b>"
+    parts = [json.dumps("<div style='font-family: Arial, sans-serif;'><h3 style='margin: 0 0 10px 0;'>"),
+             value('common_name'), json.dumps('</h3>')]
+    for label, column in POPUP_FIELDS:
+        if column is None:
+            parts += [json.dumps(p + 'Location:</b> '), 'row[0].toFixed(4)', json.dumps('°N, '),
+                      'row[1].toFixed(4)', json.dumps('°E</p>')]
+        else:
+            parts += [json.dumps(p + label + ':</b> '), value(column), json.dumps('</p>')]
+    parts.append(json.dumps('</div>'))
+    return f"""
+function (row) {{
+    var colors = {json.dumps(COLLECTION_COLORS)};
+    var color = colors[{value('collection')}] || 'gray';
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {{
+        radius: 5, color: color, fill: true, fillColor: color, fillOpacity: 0.7
+    }});
+    marker.bindPopup({' + '.join(parts)}, {{maxWidth: 300}});
+    return marker;
+}};
+"""
+
+
+def add_markers_fast(m, df):
+    columns = [column for column in POPUP_COLUMNS if column in df]
+    data = pd.DataFrame({'lat': df['latitude'].astype(float), 'lon': df['longitude'].astype(float)})
+    for column in columns:
+        data[column] = df[column].astype(str)
+    FastMarkerCluster(data.values.tolist(), callback=fast_marker_callback(columns)).add_to(m)
+    return m
+
+
+def add_grid_bins(m, df, cell_degrees=1.0):
+    # One marker per (collection, cell) sized by the number of recordings in it
+    lat_cell = np.floor(df['latitude'].to_numpy(dtype=float) / cell_degrees)
+    lon_cell = np.floor(df['longitude'].to_numpy(dtype=float) / cell_degrees)
+    bins = (pd.DataFrame({'collection': df['collection'].astype(str).to_numpy(),
+                          'lat_cell': lat_cell, 'lon_cell': lon_cell})
+            .groupby(['collection', 'lat_cell', 'lon_cell']).size().reset_index(name='count'))
+    bins['lat'] = (bins['lat_cell'] + 0.5) * cell_degrees
+    bins['lon'] = (bins['lon_cell'] + 0.5) * cell_degrees
+
+    for collection, group in bins.groupby('collection'):
+        color = COLLECTION_COLORS.get(collection, 'gray')
+        layer = folium.FeatureGroup(name=f'{collection} ({group["count"].sum()})').add_to(m)
+        for lat, lon, count in zip(group['lat'], group['lon'], group['count']):
+            folium.CircleMarker(
+                location=[lat, lon],
+                radius=float(3 + 3 * np.log10(count)),
+                tooltip=f'{collection}: {count} recordings',
+                color=color,
+                fill=True,
+                fill_color=color,
+                fill_opacity=0.7
+            ).add_to(layer)
+    folium.LayerControl().add_to(m)
+    return m
+
+
+def build_map(df, mode='markers', cell_degrees=1.0):
+    m = base_map(df)
+    if mode == 'markers':
+        return add_markers_loop(m, df)
+    if mode == 'fast':
+        return add_markers_fast(m, df)
+    if mode == 'grid':
+        return add_grid_bins(m, df, cell_degrees)
+    raise ValueError(f'unknown map mode {mode!r}, expected one of {MODES}')
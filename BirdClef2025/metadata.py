@@ -0,0 +1,141 @@
+# Indexed metadata store for train.csv
+# The CSV is converted once to Feather with categorical string columns,
+# alongside a species -> row index (rows grouped by species, CSR style) and
+# a small JSON species list. Later runs read only the columns they need
+# from the memory-mapped Feather file, and species lookups are dict access.
+# pandas is imported only to build the store or read columns, so listing the
+# species at startup needs nothing but json.
+
+import json
+import os
+import numpy as np
+
+from .config import load_config, project_path
+
+SPECIES_COLUMN = 'scientific_name'
+# Bumped when build() changes what it writes, so older stores are rebuilt
+FORMAT_VERSION = 2
+
+
+def default_metadata_dir(config=None):
+    config = config or load_config()
+    return project_path(os.path.join(config['paths']['processed_data'], 'metadata'))
+
+
+class MetadataStore:
+    """Columnar copy of a metadata CSV with a precomputed species index."""
+
+    def __init__(self, csv_path='rawdata/train.csv', cache_dir=None):
+        self.csv_path = csv_path
+        self.cache_dir = cache_dir or default_metadata_dir()
+        stem = os.path.splitext(os.path.basename(csv_path))[0]
+        self.feather_path = os.path.join(self.cache_dir, stem + '.feather')
+        self.index_path = os.path.join(self.cache_dir, stem + '.index.npz')
+        self.info_path = os.path.join(self.cache_dir, stem + '.json')
+        self._columns = {}
+        self._values = {}
+        self._species = None
+        self._species_rows = None
+        self.ensure()
+
+    def _source_stamp(self):
+        stat = os.stat(self.csv_path)
+        return {'csv': os.path.abspath(self.csv_path), 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+    def is_current(self):
+        if not (os.path.exists(self.info_path) and os.path.exists(self.feather_path)
+                and os.path.exists(self.index_path)):
+            return False
+        with open(self.info_path) as f:
+            info = json.load(f)
+        return info.get('format') == FORMAT_VERSION and info['source'] == self._source_stamp()
+
+    def ensure(self):
+        # Convert the CSV if it is new or has changed since the last conversion
+        if not self.is_current():
+            self.build()
+
+    def build(self):
+        import pandas as pd
+        os.makedirs(self.cache_dir, exist_ok=True)
+        df = pd.read_csv(self.csv_path)
+        # Repeated strings (species, collection, license, ...) become categoricals;
+        # pandas 3 reads strings as the str dtype rather than object
+        for column in df.columns:
+            if (pd.api.types.is_string_dtype(df[column]) or df[column].dtype == object) \
+                    and df[column].nunique() < 0.5 * len(df):
+                df[column] = df[column].astype('category')
+        df.reset_index(drop=True).to_feather(self.feather_path + '.tmp')
+        os.replace(self.feather_path + '.tmp', self.feather_path)
+
+        # Rows grouped by species: rows[offsets[i]:offsets[i+1]] belong to species[i]
+        codes = pd.Categorical(df[SPECIES_COLUMN])
+        species = np.asarray(codes.categories, dtype=str)
+        order = np.argsort(codes.codes, kind='stable')
+        counts = np.bincount(codes.codes[codes.codes >= 0], minlength=len(species))
+        rows = order[len(order) - counts.sum():]
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        with open(self.index_path + '.tmp', 'wb') as f:
+            np.savez(f, species=species, rows=rows, offsets=offsets)
+        os.replace(self.index_path + '.tmp', self.index_path)
+
+        info = {'format': FORMAT_VERSION, 'source': self._source_stamp(), 'n_rows': len(df),
+                'columns': list(df.columns), 'species': species.tolist()}
+        with open(self.info_path + '.tmp', 'w') as f:
+            json.dump(info, f)
+        os.replace(self.info_path + '.tmp', self.info_path)
+        self._columns = {}
+        self._values = {}
+        self._species = None
+        self._species_rows = None
+
+    def _load_index(self):
+        if self._species_rows is None:
+            with np.load(self.index_path) as index:
+                species, rows, offsets = index['species'], index['rows'], index['offsets']
+            self._species = species.tolist()
+            self._species_rows = {name: rows[offsets[i]:offsets[i + 1]] for i, name in enumerate(self._species)}
+
+    @property
+    def column_names(self):
+        with open(self.info_path) as f:
+            return json.load(f)['columns']
+
+    def species(self):
+        # Sorted species names, from the small JSON list until the index is loaded
+        if self._species is None:
+            with open(self.info_path) as f:
+                return json.load(f)['species']
+        return self._species
+
+    def rows(self, species):
+        # Row positions of one species, empty if unknown
+        self._load_index()
+        return self._species_rows.get(species, np.empty(0, dtype=np.int64))
+
+    def _load_columns(self, names):
+        # Load only the requested columns, each at most once
+        import pandas as pd
+        missing = [name for name in names if name not in self._columns]
+        if missing:
+            df = pd.read_feather(self.feather_path, columns=missing)
+            for name in missing:
+                self._columns[name] = df[name]
+                # Plain numpy copy for select(): fancy indexing a few rows of it is
+                # microseconds, where pandas take on Arrow-backed strings is not
+                self._values[name] = df[name].to_numpy()
+
+    def columns(self, names):
+        import pandas as pd
+        self._load_columns(names)
+        return pd.DataFrame({name: self._columns[name] for name in names})
+
+    def select(self, species, columns, limit=None):
+        # Rows of one species with the given columns; each column is sliced before
+        # the frame is built, so the cost follows the species size, not the table size
+        import pandas as pd
+        rows = self.rows(species)
+        if limit is not None:
+            rows = rows[:limit]
+        self._load_columns(columns)
+        return pd.DataFrame({name: self._values[name][rows] for name in columns}, index=rows)
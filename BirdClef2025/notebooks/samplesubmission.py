@@ -1,7 +1,6 @@
 import os
-import librosa
+import sys
 import numpy as np
-import pandas as pd
 
 #Set seed to reproduce "random" results for debugging
 np.random.seed(42)
@@ -12,41 +11,126 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 #Get the project root directory (two levels up from notebooks)
 project_root = os.path.dirname(os.path.dirname(script_dir))
 
-#Class labels (file names) from train audio
-train_audio_path = os.path.join(project_root, 'rawdata/train_audio/')
-class_labels = sorted(os.listdir(train_audio_path))
+#Make the shared BirdClef2025 helpers importable when run as a script
+sys.path.insert(0, project_root)
+from BirdClef2025.submission import IncrementalSubmission, SubmissionWriter
+from BirdClef2025.batching import chunk_signal, batch_soundscapes, score_batches
+from BirdClef2025.pipeline import PrefetchPool, load_soundscape
+from BirdClef2025.profiling import Profiler
+from BirdClef2025.feature_cache import FeatureCache
+from BirdClef2025.streaming import stream_batches
+from BirdClef2025.config import audio_params
 
-#List of test soundscapes
-test_soundscape_path = os.path.join(project_root, 'rawdata/test_soundscapes/')
-test_soundscapes = [os.path.join(test_soundscape_path, afile) for afile in sorted(os.listdir(test_soundscape_path))]
+#Chunks from several soundscapes are scored together in fixed-size batches
+BATCH_SIZE = 64
+
+#Soundscapes are decoded ahead of scoring on a pool (None = one worker per core)
+#Processes sidestep the GIL for decoding, threads avoid pickling the signals back
+DECODE_WORKERS = None
+PREFETCH = None
+USE_PROCESSES = True
+
+#'pool' decodes whole soundscapes on the worker pool above, 'stream' decodes 5-second
+#frames on demand so peak memory no longer grows with soundscape length
+DECODE_MODE = 'pool'
+
+#Model input: 'audio' for raw 5-second chunks at the configured sample rate,
+#'mel' for (n_mels, frames) spectrogram chunks read through the shared feature cache
+MODEL_INPUT = 'audio'
+
+#Instrumentation: a per-stage table is always printed; TRACE_PATH also writes a JSON trace
+#and PROFILER ('cprofile' or 'pyinstrument') profiles the run into submission_profile.*
+TRACE_PATH = None
+PROFILER = None
+
+#Incremental mode: rows of each finished soundscape are appended to this checkpoint file, a
+#restarted run skips soundscapes already in it and submission.csv is merged from it at the end.
+#The checkpoint is removed once submission.csv is written. None keeps all scores in memory
+CHECKPOINT_PATH = None
+timer = Profiler(PROFILER)
+
+with timer.time('list files'):
+    #Class labels (file names) from train audio
+    train_audio_path = os.path.join(project_root, 'rawdata/train_audio/')
+    class_labels = sorted(os.listdir(train_audio_path))
+
+    #List of test soundscapes
+    test_soundscape_path = os.path.join(project_root, 'rawdata/test_soundscapes/')
+    test_soundscapes = [os.path.join(test_soundscape_path, afile) for afile in sorted(os.listdir(test_soundscape_path))]
 
 # Open each soundscape and make predictions for 5-second segments
-# Use pandas df with 'row_id' plus class labels as columns
-predictions = pd.DataFrame(columns=['row_id'] + class_labels)
-
-for soundscape in test_soundscapes:
-    # Load audio
-    sig, rate = librosa.load(path=soundscape, sr=None)
-
-    # Split into 5-second chunks
-    chunks = []
-    for i in range(0, len(sig), rate*5):
-        chunk = sig[i:i+rate*5]
-        chunks.append(chunk)
-        
-    # Make predictions for each chunk
-    for i, chunk in enumerate(chunks):
-        # Get row id  (soundscape id + end time of 5s chunk)      
-        row_id = os.path.basename(soundscape).split('.')[0] + f'_{i * 5 + 5}'
-        
-        # Make prediction (let's use random scores for now)
-        # scores = model.predict(chunk)...
-        scores = np.random.rand(len(class_labels))
-        
-        # Append to predictions as new row
-        new_row = pd.DataFrame([[row_id] + list(scores)], columns=['row_id'] + class_labels)
-        predictions = pd.concat([predictions, new_row], axis=0, ignore_index=True)
-        
-# Save prediction as csv
-predictions.to_csv('submission.csv', index=False)
-predictions.head() 
\ No newline at end of file
+
+def predict_batch(batch):
+    # Make predictions for a (BATCH_SIZE, rate*5) or (BATCH_SIZE, n_mels, frames) batch of chunks
+    # (let's use random scores for now)
+    # Audio batches can be turned into mel features in one vectorized pass:
+    # features = FeatureEngine.from_params(audio_params()).mel_db(batch)
+    # return model.predict(features)...
+    #Counted per batch: the final batch is zero-padded, real chunks go to the 'chunks' counter
+    with timer.time('score'):
+        return np.random.rand(len(batch), len(class_labels))
+
+def soundscape_chunks(soundscapes):
+    # Load audio in the worker pool, results come back in file order
+    pool = PrefetchPool(load_soundscape, workers=DECODE_WORKERS, prefetch=PREFETCH,
+                        processes=USE_PROCESSES, timer=timer)
+    for soundscape, (sig, rate) in pool.imap(soundscapes):
+        # Split into 5-second chunks (strided view, only the last short chunk is padded)
+        yield soundscape, chunk_signal(sig, rate*5)
+
+def soundscape_mel_chunks(feature_cache, soundscapes):
+    # Cached mel spectrograms, decoded only on a cold cache
+    pool = PrefetchPool(feature_cache.mel_chunks, workers=DECODE_WORKERS, prefetch=PREFETCH,
+                        processes=USE_PROCESSES, timer=timer)
+    yield from pool.imap(soundscapes)
+
+#Guard so spawned decode workers do not re-run the submission
+if __name__ == "__main__":
+    timer.start_profile()
+
+    # Scores go into a preallocated 'row_id' plus class labels table sized from the file headers
+    with timer.time('setup'):
+        if CHECKPOINT_PATH:
+            predictions = IncrementalSubmission(test_soundscapes, class_labels, CHECKPOINT_PATH,
+                                                sample_rate=audio_params()['sample_rate'])
+            soundscapes = predictions.remaining
+            print(f'{len(test_soundscapes) - len(soundscapes)} of {len(test_soundscapes)} soundscapes '
+                  f'restored from {CHECKPOINT_PATH}')
+        else:
+            predictions = SubmissionWriter(test_soundscapes, class_labels, sample_rate=audio_params()['sample_rate'])
+            soundscapes = test_soundscapes
+
+    if MODEL_INPUT == 'mel':
+        feature_cache = FeatureCache()
+        params = feature_cache.params
+        chunk_shape = (params['n_mels'], 1 + params['sample_rate']*5 // params['hop_length'])
+        batches = batch_soundscapes(soundscape_mel_chunks(feature_cache, soundscapes), BATCH_SIZE, chunk_shape)
+    elif DECODE_MODE == 'stream':
+        batches = timer.iterate(stream_batches(soundscapes, BATCH_SIZE), 'stream decode')
+    else:
+        # Soundscapes are decoded at config.yaml's sample_rate, resampled only if needed
+        rate = audio_params()['sample_rate']
+        batches = batch_soundscapes(soundscape_chunks(soundscapes), BATCH_SIZE, (rate*5,))
+    def store_scores(soundscape, scores, first_chunk):
+        timer.count('chunks', len(scores))
+        predictions.fill(soundscape, scores, first_chunk)
+
+    score_batches(batches, predict_batch, store_scores)
+    timer.count('files', len(soundscapes))
+
+    #pandas is only needed for the CSV; importing it is its own stage so 'write' times the write alone
+    with timer.time('import pandas'):
+        import pandas  # noqa: F401
+    # Save prediction as csv
+    with timer.time('write'):
+        predictions.write('submission.csv')
+    if CHECKPOINT_PATH:
+        predictions.close(remove=True)
+
+    profile_path = timer.stop_profile('submission_profile')
+    print(timer.report())
+    if profile_path:
+        print(f'Profile written to {profile_path}')
+    if TRACE_PATH:
+        timer.write_trace(TRACE_PATH)
+        print(f'Trace written to {TRACE_PATH}')
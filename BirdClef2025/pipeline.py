@@ -0,0 +1,56 @@
+# Producer stage for soundscape decoding and feature extraction
+# A bounded thread or process pool runs the load function ahead of the
+# consumer, keeping at most `prefetch` files in flight, and yields results
+# in input order so submissions stay deterministic.
+
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+
+from .audio_io import load_audio
+from .profiling import Profiler
+
+
+def load_soundscape(path, sr=None):
+    # Decode one file at sr (default: the configured rate); module level so it
+    # can be pickled for process pools
+    return load_audio(path, sr=sr)
+
+
+def _timed_call(func, item):
+    start = time.perf_counter()
+    result = func(item)
+    return result, time.perf_counter() - start
+
+
+class PrefetchPool:
+    """Ordered, bounded map of func over items on a worker pool."""
+
+    def __init__(self, func, workers=None, prefetch=None, processes=False, timer=None, stage='decode'):
+        self.func = func
+        self.workers = workers or os.cpu_count() or 1
+        self.prefetch = max(1, prefetch or 2 * self.workers)
+        self.processes = processes
+        self.timer = timer if timer is not None else Profiler()
+        self.stage = stage
+
+    def imap(self, items):
+        # Yields (item, result); the worker time goes to `stage` and the time the
+        # consumer spent blocked on the next result goes to `<stage> wait`
+        executor_cls = ProcessPoolExecutor if self.processes else ThreadPoolExecutor
+        items = iter(items)
+        with executor_cls(max_workers=self.workers) as executor:
+            pending = deque((item, executor.submit(_timed_call, self.func, item))
+                            for item in islice(items, self.prefetch))
+            while pending:
+                item, future = pending.popleft()
+                wait_start = time.perf_counter()
+                result, seconds = future.result()
+                self.timer.add(self.stage + ' wait', time.perf_counter() - wait_start)
+                # Worker durations show up in the trace as ending when they were collected
+                self.timer.add(self.stage, seconds, lane=self.stage + ' workers')
+                for next_item in islice(items, 1):
+                    pending.append((next_item, executor.submit(_timed_call, self.func, next_item)))
+                yield item, result
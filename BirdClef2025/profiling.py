@@ -0,0 +1,142 @@
+# Lightweight run instrumentation
+# Profiler collects per-stage wall time (context manager, generator wrapper
+# or durations reported by worker pools), named counters and peak RSS. It
+# prints a summary table, can write a JSON trace in Chrome trace-event
+# format (open in chrome://tracing or ui.perfetto.dev), and can wrap the run
+# in cProfile or pyinstrument.
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PROFILERS = ('cprofile', 'pyinstrument')
+
+
+def peak_rss_bytes(children=False):
+    # Peak resident set size of this process (or its finished children), None if unknown
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return usage.ru_maxrss if sys.platform == 'darwin' else usage.ru_maxrss * 1024
+
+
+class Profiler:
+    """Stage timers, counters and an optional cProfile/pyinstrument hook."""
+
+    def __init__(self, profiler=None):
+        if profiler not in (None,) + PROFILERS:
+            raise ValueError(f'unknown profiler {profiler!r}, expected one of {PROFILERS}')
+        self.stages = {}
+        self.counters = {}
+        self.events = []
+        self.profiler = profiler
+        self._profile = None
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+
+    def add(self, stage, seconds, count=1, end=None, lane=None):
+        # Record a finished stage of `seconds` ending at `end` (default: now);
+        # lane names the trace row (default: the calling thread)
+        end = time.perf_counter() if end is None else end
+        with self._lock:
+            total, n = self.stages.get(stage, (0.0, 0))
+            self.stages[stage] = (total + seconds, n + count)
+            self.events.append((stage, end - seconds - self._start, seconds, lane or threading.get_ident()))
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    @contextmanager
+    def time(self, stage, count=1):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.add(stage, end - start, count, end)
+
+    def iterate(self, iterable, stage):
+        # Yield from iterable, charging the time spent producing each item to stage
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            end = time.perf_counter()
+            self.add(stage, end - start, 1, end)
+            yield item
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self._start
+
+    def start_profile(self):
+        if self.profiler == 'cprofile':
+            import cProfile
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        elif self.profiler == 'pyinstrument':
+            from pyinstrument import Profiler as Pyinstrument
+            self._profile = Pyinstrument()
+            self._profile.start()
+
+    def stop_profile(self, path):
+        # Writes <path>.prof (cProfile, for pstats/snakeviz) or <path>.html (pyinstrument)
+        if self._profile is None:
+            return None
+        if self.profiler == 'cprofile':
+            self._profile.disable()
+            path = path + '.prof'
+            self._profile.dump_stats(path)
+        else:
+            self._profile.stop()
+            path = path + '.html'
+            with open(path, 'w') as f:
+                f.write(self._profile.output_html())
+        self._profile = None
+        return path
+
+    def report(self):
+        wall = self.elapsed
+        lines = [f"{'stage':<16}{'count':>8}{'total s':>10}{'mean ms':>10}{'% wall':>8}{'per sec':>10}"]
+        for stage, (total, n) in self.stages.items():
+            mean_ms = 1000 * total / n if n else 0.0
+            rate = n / total if total else 0.0
+            lines.append(f'{stage:<16}{n:>8}{total:>10.3f}{mean_ms:>10.2f}{100 * total / wall:>8.1f}{rate:>10.1f}')
+        for name, n in self.counters.items():
+            lines.append(f'{name:<16}{n:>8}{"":>10}{"":>10}{"":>8}{n / wall:>10.1f}')
+        lines.append(f'wall time {wall:.3f} s')
+        rss, child_rss = peak_rss_bytes(), peak_rss_bytes(children=True)
+        if rss is not None:
+            lines.append(f'peak RSS {rss / 1024 ** 2:.1f} MB (largest worker {child_rss / 1024 ** 2:.1f} MB)')
+        return '\n'.join(lines)
+
+    def summary(self):
+        wall = self.elapsed
+        return {
+            'wall_seconds': wall,
+            'stages': {stage: {'count': n, 'seconds': total} for stage, (total, n) in self.stages.items()},
+            'counters': {name: {'count': n, 'per_second': n / wall} for name, n in self.counters.items()},
+            'peak_rss_bytes': peak_rss_bytes(),
+            'peak_child_rss_bytes': peak_rss_bytes(children=True),
+        }
+
+    def write_trace(self, path):
+        # Chrome trace-event JSON; the summary rides along under "otherData"
+        pid = os.getpid()
+        events = [{'name': stage, 'ph': 'X', 'ts': start * 1e6, 'dur': seconds * 1e6, 'pid': pid, 'tid': tid}
+                  for stage, start, seconds, tid in self.events]
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'otherData': self.summary()}, f)
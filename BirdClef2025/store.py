@@ -0,0 +1,168 @@
+# Sharded, memory-mappable array store
+# Arrays with a common leading shape are concatenated along their last axis
+# into large .npy shard files; manifest.json maps each key to its shard,
+# offset and length plus the source file's mtime/size, so reads are
+# zero-copy memmap slices and rebuilds can skip entries that are up to date.
+# build_store() is the resumable build loop shared by the store CLIs.
+
+import json
+import os
+import time
+import numpy as np
+
+from .config import PROJECT_ROOT
+
+MANIFEST = 'manifest.json'
+
+
+def source_key(audio_path, audio_dir):
+    # Key of a source file under audio_dir (its train.csv filename), or None for files outside it
+    rel = os.path.relpath(os.path.abspath(audio_path), os.path.abspath(audio_dir))
+    if rel.startswith(os.pardir):
+        return None
+    return rel.replace(os.sep, '/')
+
+
+class ShardedStore:
+    """Reader and appender for a directory of shards plus manifest.json."""
+
+    def __init__(self, root, params=None, dtype=None, shard_bytes=256 * 1024 ** 2):
+        # params=None or dtype=None accept what the store was built with; new stores are float16
+        self.root = root
+        self.dtype = np.dtype(dtype or np.float16)
+        self.shard_bytes = shard_bytes
+        self._pending = []
+        self._pending_bytes = 0
+        self._shards = {}
+        os.makedirs(root, exist_ok=True)
+
+        self.manifest = {'params': params, 'dtype': self.dtype.str, 'shards': [], 'entries': {}}
+        path = os.path.join(root, MANIFEST)
+        if os.path.exists(path):
+            with open(path) as f:
+                manifest = json.load(f)
+            # Entries made with other parameters are stale; keep the shard list so names stay unique
+            if params is None or (manifest['params'] == params
+                                  and (dtype is None or manifest['dtype'] == self.dtype.str)):
+                self.manifest = manifest
+                self.dtype = np.dtype(manifest['dtype'])
+            else:
+                self.manifest['shards'] = manifest['shards']
+
+    @property
+    def entries(self):
+        return self.manifest['entries']
+
+    @property
+    def params(self):
+        return self.manifest['params']
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def is_current(self, key, source_path):
+        # True when key was stored from this exact version of source_path
+        entry = self.entries.get(key)
+        if entry is None:
+            return False
+        stat = os.stat(source_path)
+        return entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size
+
+    def _shard(self, name):
+        if name not in self._shards:
+            self._shards[name] = np.load(os.path.join(self.root, name), mmap_mode='r')
+        return self._shards[name]
+
+    def get(self, key, start=0, stop=None):
+        # Read-only memmap view of one entry, optionally a [start, stop) slice of its last axis
+        entry = self.entries[key]
+        length = entry['length']
+        stop = length if stop is None else min(stop, length)
+        start = min(max(start, 0), stop)
+        shard = self._shard(entry['shard'])
+        return shard[..., entry['offset'] + start:entry['offset'] + stop]
+
+    def add(self, key, array, source_path=None):
+        # Queue an array; it becomes readable once its shard is flushed
+        array = np.asarray(array, dtype=self.dtype)
+        stat = os.stat(source_path) if source_path else None
+        self._pending.append((key, array, stat))
+        self._pending_bytes += array.nbytes
+        if self._pending_bytes >= self.shard_bytes:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        name = f'shard-{len(self.manifest["shards"]):05d}.npy'
+        data = np.concatenate([array for _, array, _ in self._pending], axis=-1)
+        tmp_path = os.path.join(self.root, name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.save(f, data)
+        os.replace(tmp_path, os.path.join(self.root, name))
+
+        offset = 0
+        for key, array, stat in self._pending:
+            self.entries[key] = {
+                'shard': name,
+                'offset': offset,
+                'length': int(array.shape[-1]),
+                'mtime_ns': stat.st_mtime_ns if stat else None,
+                'size': stat.st_size if stat else None,
+            }
+            offset += array.shape[-1]
+        self.manifest['shards'].append(name)
+        self._pending = []
+        self._pending_bytes = 0
+        self._write_manifest()
+
+    def _write_manifest(self):
+        # Replace atomically so an interrupted run leaves the previous manifest intact
+        path = os.path.join(self.root, MANIFEST)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(self.manifest, f)
+        os.replace(path + '.tmp', path)
+
+
+def add_build_arguments(parser, default_out):
+    # Command line options shared by the store CLIs
+    parser.add_argument('--train-csv', default=os.path.join(PROJECT_ROOT, 'rawdata', 'train.csv'))
+    parser.add_argument('--audio-dir', default=os.path.join(PROJECT_ROOT, 'rawdata', 'train_audio'))
+    parser.add_argument('--out', default=None, help=f'store directory (default: {default_out})')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: one per core)')
+    parser.add_argument('--shard-mb', type=int, default=256)
+
+
+def build_store(store, names, audio_dir, func, stage, workers=None):
+    # Add func(path) for every name under audio_dir whose entry is missing or out of date.
+    # func runs on a process pool and returns the array, or the exception for a file it
+    # could not process, which is reported and skipped. Returns the skipped names
+    from .pipeline import PrefetchPool
+
+    todo = [name for name in names if not store.is_current(name, os.path.join(audio_dir, name))]
+    print(f'{len(names) - len(todo)} of {len(names)} files up to date, {len(todo)} to {stage}')
+
+    pool = PrefetchPool(func, workers=workers, processes=True, stage=stage)
+    start = time.perf_counter()
+    paths = [os.path.join(audio_dir, name) for name in todo]
+    failed = []
+    try:
+        for i, (name, (path, array)) in enumerate(zip(todo, pool.imap(paths)), 1):
+            if isinstance(array, Exception):
+                print(f'Skipping {name}: {array!r}')
+                failed.append(name)
+            else:
+                store.add(name, array, source_path=path)
+            if i % 100 == 0 or i == len(paths):
+                elapsed = time.perf_counter() - start
+                print(f'{i}/{len(paths)} files, {i / elapsed:.1f} files/sec')
+    finally:
+        # Keep everything finished so far, also on Ctrl-C
+        store.flush()
+    print(pool.timer.report())
+    if failed:
+        print(f'{len(failed)} files could not be processed: ' + ', '.join(failed))
+    return failed
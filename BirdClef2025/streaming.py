@@ -0,0 +1,85 @@
+# Streaming audio reader
+# Decodes a file block by block with soundfile and yields mono frames
+# aligned to a fixed frame grid (5 seconds by default), so memory stays at
+# one frame regardless of recording length and the first frame can be
+# scored before the rest of the file is decoded. Files whose native rate
+# differs from the requested one go through a stateful soxr stream of the
+# configured quality; with the 'polyphase' resampler, which has no streaming
+# form, the rest of the file is resampled in one go so frames still match
+# load_audio exactly.
+
+import numpy as np
+import soundfile as sf
+
+from .audio_io import STREAM_QUALITIES, StreamResampler, default_audio_settings, resample, to_mono
+from .batching import ChunkBatcher
+from .submission import resampled_length
+
+
+def stream_frames(path, frame_seconds=5, offset=0.0, pad=True, sr=None, resampler=None):
+    # Yields (frame_index, frame) at sr (default: the configured rate, 0 = native)
+    # starting at the frame that contains `offset` seconds; the final short
+    # frame is zero-padded unless pad=False
+    if sr is None:
+        sr = default_audio_settings()[0]
+    resampler = resampler or default_audio_settings()[1]
+    with sf.SoundFile(path) as f:
+        native_sr = f.samplerate
+        sr = sr or native_sr
+        native_len = native_sr * frame_seconds
+        first = int(offset // frame_seconds)
+        if first * native_len >= f.frames:
+            return
+        if first:
+            f.seek(first * native_len)
+
+        if sr == native_sr:
+            blocks = f.blocks(blocksize=native_len, dtype='float32', always_2d=True,
+                              fill_value=0.0 if pad else None)
+            for i, block in enumerate(blocks, first):
+                yield i, to_mono(block)
+            return
+
+        # Resampled output is re-cut into frames of sr * frame_seconds samples
+        frame_len = sr * frame_seconds
+        if resampler not in STREAM_QUALITIES:
+            y = resample(to_mono(f.read(dtype='float32', always_2d=True)), native_sr, sr, resampler)
+            for i, start in enumerate(range(0, len(y), frame_len), first):
+                frame = y[start:start + frame_len]
+                if pad and len(frame) < frame_len:
+                    frame = np.concatenate([frame, np.zeros(frame_len - len(frame), dtype=np.float32)])
+                yield i, frame
+            return
+        expected = resampled_length(f.frames - first * native_len, native_sr, sr)
+        resampler = StreamResampler(native_sr, sr, resampler)
+        buffer = np.empty(0, dtype=np.float32)
+        i, produced = first, 0
+        for block in f.blocks(blocksize=native_len, dtype='float32', always_2d=True):
+            buffer = np.concatenate([buffer, resampler(to_mono(block))])
+            while len(buffer) >= frame_len and produced < expected:
+                yield i, buffer[:frame_len]
+                buffer = buffer[frame_len:]
+                i, produced = i + 1, produced + frame_len
+        buffer = np.concatenate([buffer, resampler(np.empty(0, dtype=np.float32), last=True)])
+        while produced < expected:
+            frame = buffer[:min(frame_len, expected - produced)]
+            buffer = buffer[len(frame):]
+            if pad and len(frame) < frame_len:
+                frame = np.concatenate([frame, np.zeros(frame_len - len(frame), dtype=np.float32)])
+            yield i, frame
+            i, produced = i + 1, produced + frame_len
+
+
+def stream_batches(paths, batch_size, frame_seconds=5, sr=None, resampler=None):
+    # Fixed-size batches of frames streamed from each file in order; only one
+    # frame per file is ever decoded ahead of the batch being filled
+    if not paths:
+        return
+    if sr is None:
+        sr = default_audio_settings()[0]
+    frame_len = (sr or sf.info(paths[0]).samplerate) * frame_seconds
+    batcher = ChunkBatcher(batch_size, (frame_len,))
+    for path in paths:
+        for i, frame in stream_frames(path, frame_seconds, sr=sr, resampler=resampler):
+            yield from batcher.add(path, frame[None], first_chunk=i)
+    yield from batcher.flush()
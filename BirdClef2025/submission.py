@@ -0,0 +1,249 @@
+# Preallocated submission builder
+# The score matrix and row ids are sized up front from the soundscape
+# durations, filled one batch at a time and written in a single pass,
+# instead of growing a DataFrame with pd.concat for every 5-second chunk.
+# pandas is only needed for the final write, so it is imported there and
+# decode worker processes that import this module do not pay for it.
+#
+# IncrementalSubmission is the restartable variant: each soundscape's rows go
+# to an append-only checkpoint file as soon as all its chunks are scored, a
+# restarted run skips soundscapes already in the file, and submission.csv is
+# merged from it in soundscape order at the end. Only soundscapes still being
+# scored are held in memory.
+
+import json
+import os
+import struct
+import numpy as np
+import soundfile as sf
+
+CHUNK_SECONDS = 5
+CHECKPOINT_MAGIC = b'BCSCORE1'
+
+
+def soundscape_id(path):
+    # Soundscape id is the file name without extension
+    return os.path.basename(path).split('.')[0]
+
+
+def count_chunks(n_samples, rate, chunk_seconds=CHUNK_SECONDS):
+    # Same count as range(0, n_samples, rate*chunk_seconds); the last chunk may be short
+    step = rate * chunk_seconds
+    return -(-n_samples // step)
+
+
+def resampled_length(n_samples, orig_sr, target_sr):
+    # Length after resampling, as librosa.resample returns it
+    return int(np.ceil(n_samples * target_sr / orig_sr))
+
+
+def chunk_row_ids(sid, n_chunks, chunk_seconds=CHUNK_SECONDS):
+    # '<soundscape id>_<end second>' for each chunk
+    return [f'{sid}_{(i + 1) * chunk_seconds}' for i in range(n_chunks)]
+
+
+def write_csv_header(f, class_labels):
+    f.write(','.join(['row_id'] + list(class_labels)) + '\n')
+
+
+def write_csv_rows(f, class_labels, row_ids, scores):
+    import pandas as pd
+    block = pd.DataFrame(scores, columns=class_labels)
+    block.insert(0, 'row_id', row_ids)
+    block.to_csv(f, header=False, index=False)
+
+
+def soundscape_chunk_counts(soundscapes, chunk_seconds=CHUNK_SECONDS, sample_rate=None):
+    # Read only the file headers, no audio is decoded here; sample_rate is the
+    # rate the audio will be decoded at (default: native)
+    counts = []
+    for path in soundscapes:
+        info = sf.info(path)
+        rate = sample_rate or info.samplerate
+        counts.append(count_chunks(resampled_length(info.frames, info.samplerate, rate), rate, chunk_seconds))
+    return counts
+
+
+class SubmissionWriter:
+    """Fixed-size float32 score matrix with one row per 5-second chunk."""
+
+    def __init__(self, soundscapes, class_labels, chunk_counts=None, chunk_seconds=CHUNK_SECONDS,
+                 sample_rate=None):
+        self.class_labels = list(class_labels)
+        self.chunk_seconds = chunk_seconds
+        if chunk_counts is None:
+            chunk_counts = soundscape_chunk_counts(soundscapes, chunk_seconds, sample_rate)
+
+        n_rows = int(sum(chunk_counts))
+        self.scores = np.zeros((n_rows, len(self.class_labels)), dtype=np.float32)
+        self.row_ids = np.empty(n_rows, dtype=object)
+
+        # Soundscape id -> (first row, number of chunks)
+        self.offsets = {}
+        start = 0
+        for path, n in zip(soundscapes, chunk_counts):
+            sid = soundscape_id(path)
+            self.row_ids[start:start + n] = chunk_row_ids(sid, n, chunk_seconds)
+            self.offsets[sid] = (start, n)
+            start += n
+
+    def __len__(self):
+        return len(self.row_ids)
+
+    def fill(self, soundscape, scores, first_chunk=0):
+        # Write scores for consecutive chunks of one soundscape
+        start, n = self.offsets[soundscape_id(soundscape)]
+        scores = np.asarray(scores, dtype=np.float32).reshape(-1, len(self.class_labels))
+        if first_chunk < 0 or first_chunk + len(scores) > n:
+            raise ValueError(f'{soundscape_id(soundscape)} has {n} chunks, '
+                             f'got rows {first_chunk}..{first_chunk + len(scores)}')
+        self.scores[start + first_chunk:start + first_chunk + len(scores)] = scores
+
+    def write(self, path, block_rows=4096):
+        # Stream the CSV block by block so no full-size copy of the table is made
+        with open(path, 'w', newline='') as f:
+            write_csv_header(f, self.class_labels)
+            for start in range(0, len(self), block_rows):
+                write_csv_rows(f, self.class_labels, self.row_ids[start:start + block_rows],
+                               self.scores[start:start + block_rows])
+
+
+class ScoreCheckpoint:
+    """Append-only file of per-soundscape float32 score blocks."""
+
+    # Layout: magic, uint32 header length, JSON header with the class labels,
+    # then records of uint32 id length, uint32 rows, id bytes, rows x classes float32.
+    # A record cut short by a crash is dropped and overwritten on reopen.
+
+    def __init__(self, path, class_labels):
+        self.path = path
+        self.class_labels = list(class_labels)
+        self.entries = {}  # soundscape id -> (data offset, rows); a later record replaces an earlier one
+        header = json.dumps({'class_labels': self.class_labels}).encode()
+        self._header = CHECKPOINT_MAGIC + struct.pack('<I', len(header)) + header
+        end = self._scan() if os.path.exists(path) else None
+        if end is None:
+            # New file, or one written for other class labels
+            self.entries = {}
+            self._file = open(path, 'wb')
+            self._file.write(self._header)
+            self._sync()
+        else:
+            self._file = open(path, 'r+b')
+            self._file.truncate(end)
+            self._file.seek(end)
+
+    def _scan(self):
+        # Index the complete records; returns where the next record goes, None if the header differs
+        row_bytes = 4 * len(self.class_labels)
+        with open(self.path, 'rb') as f:
+            if f.read(len(self._header)) != self._header:
+                return None
+            size = os.fstat(f.fileno()).st_size
+            end = f.tell()
+            while end + 8 <= size:
+                id_len, n_rows = struct.unpack('<II', f.read(8))
+                data_offset = end + 8 + id_len
+                if data_offset + n_rows * row_bytes > size:
+                    break
+                sid = f.read(id_len).decode()
+                self.entries[sid] = (data_offset, n_rows)
+                end = data_offset + n_rows * row_bytes
+                f.seek(end)
+        return end
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def __contains__(self, sid):
+        return sid in self.entries
+
+    def n_rows(self, sid):
+        return self.entries[sid][1]
+
+    def append(self, sid, scores):
+        scores = np.ascontiguousarray(scores, dtype='<f4').reshape(-1, len(self.class_labels))
+        key = sid.encode()
+        offset = self._file.tell()
+        self._file.write(struct.pack('<II', len(key), len(scores)) + key)
+        self._file.write(scores.tobytes())
+        # On disk before the soundscape counts as done
+        self._sync()
+        self.entries[sid] = (offset + 8 + len(key), len(scores))
+
+    def read(self, sid):
+        offset, n_rows = self.entries[sid]
+        self._file.flush()
+        scores = np.fromfile(self.path, dtype='<f4', count=n_rows * len(self.class_labels), offset=offset)
+        return scores.reshape(n_rows, len(self.class_labels))
+
+    def close(self):
+        self._file.close()
+
+
+class IncrementalSubmission:
+    """Restartable submission: finished soundscapes are checkpointed, not kept in memory."""
+
+    def __init__(self, soundscapes, class_labels, checkpoint_path, chunk_counts=None,
+                 chunk_seconds=CHUNK_SECONDS, sample_rate=None):
+        self.soundscapes = list(soundscapes)
+        self.class_labels = list(class_labels)
+        self.chunk_seconds = chunk_seconds
+        if chunk_counts is None:
+            chunk_counts = soundscape_chunk_counts(self.soundscapes, chunk_seconds, sample_rate)
+        self.counts = {soundscape_id(path): int(n) for path, n in zip(self.soundscapes, chunk_counts)}
+        self.checkpoint = ScoreCheckpoint(checkpoint_path, self.class_labels)
+        # Soundscape id -> (scores, filled chunk mask) while its chunks are being scored
+        self._pending = {}
+
+    def __len__(self):
+        return sum(self.counts.values())
+
+    def is_done(self, soundscape):
+        # Checkpointed with the expected number of chunks; soundscapes without chunks are always done
+        sid = soundscape_id(soundscape)
+        n = self.counts[sid]
+        return n == 0 or (sid in self.checkpoint and self.checkpoint.n_rows(sid) == n)
+
+    @property
+    def remaining(self):
+        # Soundscapes still to score, in submission order
+        return [path for path in self.soundscapes if not self.is_done(path)]
+
+    def fill(self, soundscape, scores, first_chunk=0):
+        # Same contract as SubmissionWriter.fill; a completed soundscape is checkpointed at once
+        sid = soundscape_id(soundscape)
+        n = self.counts[sid]
+        scores = np.asarray(scores, dtype=np.float32).reshape(-1, len(self.class_labels))
+        if first_chunk < 0 or first_chunk + len(scores) > n:
+            raise ValueError(f'{sid} has {n} chunks, got rows {first_chunk}..{first_chunk + len(scores)}')
+        if sid not in self._pending:
+            self._pending[sid] = (np.zeros((n, len(self.class_labels)), dtype=np.float32), np.zeros(n, dtype=bool))
+        pending, filled = self._pending[sid]
+        pending[first_chunk:first_chunk + len(scores)] = scores
+        # Refilling a chunk overwrites it, like SubmissionWriter; done once every chunk has scores
+        filled[first_chunk:first_chunk + len(scores)] = True
+        if filled.all():
+            self.checkpoint.append(sid, pending)
+            del self._pending[sid]
+
+    def write(self, path):
+        # Merge the checkpoint into the CSV in soundscape order; replaced atomically when complete
+        missing = self.remaining
+        if missing:
+            raise RuntimeError(f'{len(missing)} soundscapes are not scored yet, first: {missing[0]}')
+        with open(path + '.tmp', 'w', newline='') as f:
+            write_csv_header(f, self.class_labels)
+            for soundscape in self.soundscapes:
+                sid = soundscape_id(soundscape)
+                if self.counts[sid]:
+                    write_csv_rows(f, self.class_labels, chunk_row_ids(sid, self.counts[sid], self.chunk_seconds),
+                                   self.checkpoint.read(sid))
+        os.replace(path + '.tmp', path)
+
+    def close(self, remove=False):
+        # remove=True deletes the checkpoint, e.g. once the merged CSV is written
+        self.checkpoint.close()
+        if remove:
+            os.remove(self.checkpoint.path)
@@ -0,0 +1,46 @@
+# Small mel spectrogram tiles for the gallery view
+# A mel spectrogram is block-averaged down to a fixed (height, width), scaled
+# to its own dB range like the full figure and mapped through the magma
+# colormap into an RGB uint8 array. Tiles are a few tens of kB, are cached by
+# FeatureCache next to the features, and are shown by Tk as PPM images, so
+# browsing a species never creates a matplotlib figure.
+
+from functools import lru_cache
+
+import numpy as np
+
+THUMBNAIL_SIZE = (160, 64)  # (width, height) in pixels
+
+
+@lru_cache(maxsize=4)
+def colormap_lut(name='magma'):
+    # (256, 3) uint8 lookup table of a matplotlib colormap
+    import matplotlib
+    lut = (matplotlib.colormaps[name](np.linspace(0, 1, 256))[:, :3] * 255).round().astype(np.uint8)
+    lut.flags.writeable = False
+    return lut
+
+
+def resize_axis(S, n, axis):
+    # Mean over equal blocks when shrinking, nearest neighbour when growing
+    length = S.shape[axis]
+    if length >= n:
+        edges = np.linspace(0, length, n + 1).astype(int)
+        return np.add.reduceat(S, edges[:-1], axis=axis) / np.expand_dims(np.diff(edges), 1 - axis)
+    return np.take(S, np.arange(n) * length // n, axis=axis)
+
+
+def render_thumbnail(S_dB, size=THUMBNAIL_SIZE, cmap='magma'):
+    # (n_mels, frames) dB array -> (height, width, 3) uint8 image, low frequencies at the bottom
+    width, height = size
+    S = np.asarray(S_dB, dtype=np.float32)
+    S = resize_axis(resize_axis(S, height, 0), width, 1)
+    lo, hi = float(S.min()), float(S.max())
+    index = np.zeros(S.shape, dtype=np.uint8) if hi <= lo else ((S - lo) * (255 / (hi - lo))).astype(np.uint8)
+    return colormap_lut(cmap)[index[::-1]]
+
+
+def to_ppm(rgb):
+    # Binary PPM, which tk.PhotoImage(data=...) reads without PIL
+    height, width, _ = rgb.shape
+    return b'P6 %d %d 255\n' % (width, height) + np.ascontiguousarray(rgb, dtype=np.uint8).tobytes()
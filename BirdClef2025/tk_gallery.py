@@ -0,0 +1,129 @@
+# Virtualized thumbnail grid for the Tk viewers
+# The grid is one tk.Canvas whose scroll region covers every tile, but only
+# the rows in view (plus one above and below) get canvas items and
+# PhotoImages. Tiles are asked for as they scroll into view through
+# request_tile(index) and arrive with set_tile(index, rgb); clicking a tile
+# calls on_open(index), which is where full-size figures are made.
+
+import tkinter as tk
+from tkinter import ttk
+
+from .thumbnails import THUMBNAIL_SIZE, to_ppm
+
+
+class ThumbnailGallery:
+    """Scrolling grid of labelled tiles that only draws the visible rows."""
+
+    def __init__(self, master, tile_size=THUMBNAIL_SIZE, columns=5, rows=4, pad=6,
+                 request_tile=None, on_open=None):
+        self.tile_size = tile_size
+        self.columns = columns
+        self.pad = pad
+        self.request_tile = request_tile
+        self.on_open = on_open
+        self.labels = []
+        self.tiles = {}  # index -> (height, width, 3) uint8, kept for the current species only
+        self._drawn = {}  # index -> (canvas item ids, PhotoImage or None)
+        self._requested = set()
+
+        self.frame = tk.Frame(master)
+        self.canvas = tk.Canvas(self.frame, width=columns * self.cell[0] + pad,
+                                height=rows * self.cell[1] + pad, highlightthickness=0)
+        self.scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self._yview)
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+
+        self.canvas.bind("<Configure>", lambda e: self.update_view())
+        self.canvas.bind("<MouseWheel>", self._on_mousewheel)
+        self.canvas.bind("<Button-1>", self._on_click)
+
+    @property
+    def cell(self):
+        # Tile plus its caption line and padding
+        width, height = self.tile_size
+        return width + self.pad, height + self.pad + 14
+
+    def set_items(self, labels):
+        # New contents: drop every tile and image of the previous set
+        self.canvas.delete("all")
+        self.labels = list(labels)
+        self.tiles = {}
+        self._drawn = {}
+        self._requested = set()
+        n_rows = -(-len(self.labels) // self.columns)
+        self.canvas.configure(scrollregion=(0, 0, self.columns * self.cell[0] + self.pad,
+                                            n_rows * self.cell[1] + self.pad))
+        self.canvas.yview_moveto(0)
+        self.update_view()
+
+    def set_tile(self, index, rgb):
+        self.tiles[index] = rgb
+        if index in self._drawn:
+            self._undraw(index)
+            self._draw(index)
+
+    def visible(self):
+        # Indices of the tiles in view, one extra row above and below
+        top = self.canvas.canvasy(0)
+        bottom = self.canvas.canvasy(self.canvas.winfo_height())
+        first_row = max(int(top // self.cell[1]) - 1, 0)
+        last_row = int(bottom // self.cell[1]) + 1
+        return range(first_row * self.columns, min((last_row + 1) * self.columns, len(self.labels)))
+
+    def update_view(self):
+        visible = self.visible()
+        for index in [i for i in self._drawn if i not in visible]:
+            self._undraw(index)
+        for index in visible:
+            if index not in self._drawn:
+                self._draw(index)
+            if index not in self.tiles and index not in self._requested and self.request_tile:
+                self._requested.add(index)
+                self.request_tile(index)
+
+    def _origin(self, index):
+        row, column = divmod(index, self.columns)
+        return self.pad + column * self.cell[0], self.pad + row * self.cell[1]
+
+    def _draw(self, index):
+        x, y = self._origin(index)
+        width, height = self.tile_size
+        image = None
+        if index in self.tiles:
+            image = tk.PhotoImage(master=self.canvas, data=to_ppm(self.tiles[index]), format="PPM")
+            tile = self.canvas.create_image(x, y, image=image, anchor="nw")
+        else:
+            tile = self.canvas.create_rectangle(x, y, x + width, y + height, fill="#ddd", outline="")
+        caption = self.canvas.create_text(x, y + height + 2, text=self.labels[index], anchor="nw",
+                                          width=width, font=("TkDefaultFont", 8))
+        # The PhotoImage is referenced here so Tk does not drop it while drawn
+        self._drawn[index] = ((tile, caption), image)
+
+    def _undraw(self, index):
+        items, _ = self._drawn.pop(index)
+        self.canvas.delete(*items)
+
+    def index_at(self, x, y):
+        # Tile index under canvas coordinates, or None
+        column, dx = divmod(x - self.pad, self.cell[0])
+        row, dy = divmod(y - self.pad, self.cell[1])
+        index = int(row) * self.columns + int(column)
+        if 0 <= column < self.columns and row >= 0 and dx < self.tile_size[0] and index < len(self.labels):
+            return index
+        return None
+
+    def _on_click(self, event):
+        index = self.index_at(self.canvas.canvasx(event.x), self.canvas.canvasy(event.y))
+        if index is not None and self.on_open:
+            self.on_open(index)
+
+    def _yview(self, *args):
+        self.canvas.yview(*args)
+        self.update_view()
+
+    def _on_mousewheel(self, event):
+        self.canvas.yview_scroll(int(-1*(event.delta/120)), "units")
+        self.update_view()
+        # Keep the window's own scroll binding from moving the page as well
+        return "break"
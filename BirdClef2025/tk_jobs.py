@@ -0,0 +1,126 @@
+# Background jobs for the Tk viewers
+# Work runs on a thread pool; results are queued and delivered to callbacks
+# on the Tk main thread by a root.after poller. Each cancel() starts a new
+# generation: pending jobs are dropped and late results of older generations
+# are discarded, so a new species selection never shows stale figures.
+# Jobs submitted with cancellable=False (one-off setup work) survive cancel().
+# BackendLoader is that setup work for the viewers: it imports the feature
+# cache and figure code on a worker so the window opens without them.
+
+import queue
+import tkinter as tk
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+
+class BackgroundJobs:
+    """Thread-pool executor whose results are handed back on the Tk thread."""
+
+    def __init__(self, root, workers=2, poll_ms=30):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.generation = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._results = queue.Queue()
+        self._futures = set()
+        self._pinned = set()  # cancellable=False jobs, not dropped by cancel()
+        self._polling = False
+
+    def submit(self, func, *args, on_done=None, on_error=None, cancellable=True):
+        # on_done(result) / on_error(exception) are called on the Tk thread
+        generation = self.generation if cancellable else None
+        future = self._executor.submit(func, *args)
+        (self._futures if cancellable else self._pinned).add(future)
+
+        def done(f):
+            # Runs on a worker thread: only queue, never touch Tk here
+            if not f.cancelled():
+                self._results.put((generation, f, on_done, on_error))
+
+        future.add_done_callback(done)
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+        return future
+
+    def cancel(self):
+        # Drop everything submitted so far; running jobs finish but are ignored
+        self.generation += 1
+        for future in self._futures:
+            future.cancel()
+        self._futures.clear()
+
+    def _poll(self):
+        while True:
+            try:
+                generation, future, on_done, on_error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._futures.discard(future)
+            self._pinned.discard(future)
+            if generation is not None and generation != self.generation:
+                continue
+            error = future.exception()
+            try:
+                if error is not None:
+                    if on_error is not None:
+                        on_error(error)
+                elif on_done is not None:
+                    on_done(future.result())
+            except Exception:
+                # A failing callback must not stop delivery of the other results
+                traceback.print_exc()
+        if self._futures or self._pinned or not self._results.empty():
+            self.root.after(self.poll_ms, self._poll)
+        else:
+            self._polling = False
+
+    def shutdown(self):
+        # On window close: drop queued jobs so exit only waits for the ones already running
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def import_backend():
+    # librosa and matplotlib take seconds to import, so the window opens without
+    # them and they are loaded on a worker thread at the first Process click
+    from .audio_store import default_audio_store
+    from .extract_features import default_mel_store
+    from .feature_cache import FeatureCache
+    from .figure_pool import FigureSlot
+    # Mels and decoded audio come from the offline stores when they have been built
+    return partial(FeatureCache, audio_store=default_audio_store(), mel_store=default_mel_store()), FigureSlot
+
+
+class BackendLoader:
+    """Runs import_backend once on a BackgroundJobs pool for a viewer's Process button."""
+
+    def __init__(self, jobs, on_ready):
+        # on_ready(FeatureCache, FigureSlot) is called on the Tk thread once the import is done
+        self.jobs = jobs
+        self.on_ready = on_ready
+        self.loading = False
+
+    def load(self, button, then):
+        # The import is not cancelled by a species change, so it only ever runs once
+        if self.loading:
+            return
+        self.loading = True
+        button.config(state=tk.DISABLED, text="Loading...")
+        generation = self.jobs.generation
+
+        def ready(backend):
+            self.loading = False
+            self.on_ready(*backend)
+            button.config(state=tk.NORMAL, text="Process")
+            # Continue the click only if no other species was picked meanwhile
+            if self.jobs.generation == generation:
+                then()
+
+        def failed(e):
+            self.loading = False
+            print(f"Error loading audio libraries: {str(e)}")
+            button.config(state=tk.NORMAL, text="Process")
+
+        self.jobs.submit(import_backend, on_done=ready, on_error=failed, cancellable=False)
@@ -1,30 +1,43 @@
-import pandas as pd
 import numpy as np
-import librosa
-import librosa.display
-import matplotlib.pyplot as plt
 import tkinter as tk
 from tkinter import ttk
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import os
+import sys
 import subprocess
 import platform
 
+# Make the shared BirdClef2025 helpers importable when run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from BirdClef2025.lru import LRUCache
+from BirdClef2025.tk_jobs import BackendLoader, BackgroundJobs
+from BirdClef2025.envelope import EnvelopePyramid
+from BirdClef2025.metadata import MetadataStore
+
 class AudioVisualizer:
+    # Memory budget for audio and features kept between species selections
+    CACHE_BYTES = 512 * 1024 ** 2
+
     def __init__(self, root):
         self.root = root
         self.root.title("Bird Audio Visualizer")
-        self.audio_data = {}  # Cache for audio data
+        self.audio_data = LRUCache(self.CACHE_BYTES)  # Cache for audio data
+        self.feature_cache = None  # On-disk cache shared with the other tools, created with the backend
+        self.FigureSlot = None
+        self.jobs = BackgroundJobs(root)  # Decoding and feature extraction off the Tk thread
+        self.backend = BackendLoader(self.jobs, on_ready=self.backend_ready)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.slots = None  # Figures reused across species selections
         self.current_species = None
         self.current_recording = None
         
         # Read the training data
         try:
-            self.df = pd.read_csv('rawdata/train.csv')
-            self.scientific_names = sorted(self.df['scientific_name'].unique())
+            # Columnar copy of train.csv with a species -> rows index, built on first use
+            self.metadata = MetadataStore('rawdata/train.csv')
+            self.scientific_names = self.metadata.species()
         except Exception as e:
             print(f"Error loading training data: {str(e)}")
-            self.df = pd.DataFrame()
+            self.metadata = None
             self.scientific_names = []
         
         # Create GUI elements
@@ -75,6 +88,11 @@ class AudioVisualizer:
         
     def _on_mousewheel(self, event):
         self.canvas.yview_scroll(int(-1*(event.delta/120)), "units")
+
+    def on_close(self):
+        # Stop background work first so closing mid-decode does not wait for queued files
+        self.jobs.shutdown()
+        self.root.destroy()
         
     def open_audio_file(self, audio_path):
         try:
@@ -88,9 +106,12 @@ class AudioVisualizer:
             print(f"Error opening audio file: {str(e)}")
             
     def on_species_select(self, event):
-        # Clear previous visualizations
-        for widget in self.visualization_frame.winfo_children():
-            widget.destroy()
+        # Drop visualizations still loading for the previous species
+        self.jobs.cancel()
+
+        # Hide previous visualizations
+        for slot in (self.slots or {}).values():
+            slot.hide()
             
         selected_species = self.name_var.get()
         if not selected_species:
@@ -98,7 +119,7 @@ class AudioVisualizer:
             
         self.current_species = selected_species
         try:
-            self.current_recording = self.df[self.df['scientific_name'] == selected_species].iloc[0]
+            self.current_recording = self.metadata.select(selected_species, ['filename', 'scientific_name'], limit=1).iloc[0]
             if not self.current_recording.empty:
                 self.process_button.config(state=tk.NORMAL)
             else:
@@ -111,78 +132,90 @@ class AudioVisualizer:
         if not self.current_species or self.current_recording is None:
             return
             
-        # Clear previous visualizations
-        for widget in self.visualization_frame.winfo_children():
-            widget.destroy()
-            
-        # Load and process the audio file
-        audio_path = os.path.join('rawdata', 'train_audio', self.current_recording['filename'])
-        try:
-            # Check if we have cached audio data
-            if audio_path not in self.audio_data:
-                y, sr = librosa.load(audio_path)
-                # Compute mel spectrogram
-                S = librosa.feature.melspectrogram(y=y, sr=sr)
-                S_dB = librosa.power_to_db(S, ref=np.max)
-                # Compute magnitude spectrum
-                D = np.abs(librosa.stft(y))
-                self.audio_data[audio_path] = (y, sr, S_dB, D)
-            else:
-                y, sr, S_dB, D = self.audio_data[audio_path]
-            
-            # Create time array for plotting
-            t = np.linspace(0, len(y)/sr, len(y))
-            
-            # Create three different visualizations
-            visualizations = [
-                ("Amplitude vs Time", self.create_amplitude_plot, (t, y)),
-                ("Magnitude vs Frequency", self.create_magnitude_plot, (D, sr)),
-                ("Mel Spectrogram", self.create_mel_spectrogram, (S_dB, sr))
-            ]
+        # Drop jobs from an earlier click
+        self.jobs.cancel()
+        if self.feature_cache is None:
+            self.backend.load(self.process_button, self.process_visualizations)
+            return
             
-            for title, plot_func, args in visualizations:
-                # Create a container frame for each visualization
-                container = tk.Frame(self.visualization_frame)
-                container.pack(fill=tk.X, pady=15)
-                
-                # Create the plot
-                fig, ax = plt.subplots(figsize=(9, 5))
-                plot_func(ax, *args)
-                ax.set_title(f'{self.current_recording["scientific_name"]} - {title}', pad=20)
-                plt.tight_layout()
-                
-                # Create canvas and add to frame
-                canvas = FigureCanvasTkAgg(fig, master=container)
-                canvas.draw()
-                canvas.get_tk_widget().pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-                
-                # Add play button
-                play_button = tk.Button(container, text="Play Audio", 
-                                      command=lambda path=audio_path: self.open_audio_file(path))
-                play_button.pack(side=tk.RIGHT, padx=10)
-                
-        except Exception as e:
+        recording = self.current_recording
+        audio_path = os.path.join('rawdata', 'train_audio', recording['filename'])
+        
+        # One pooled figure per visualization, created on the first click and reused after that
+        titles = ["Amplitude vs Time", "Magnitude vs Frequency", "Mel Spectrogram"]
+        if self.slots is None:
+            self.slots = {title: self.FigureSlot(self.visualization_frame, on_play=self.open_audio_file,
+                                                 toolbar=(title == "Amplitude vs Time"))
+                          for title in titles}
+        for title in titles:
+            self.slots[title].attach()
+            self.slots[title].loading(f"Loading {title}...")
+        
+        def title_for(title):
+            return f'{recording["scientific_name"]} - {title}'
+        
+        def show_waveform(data):
+            envelope, sr = data
+            self.show_plot(self.slots["Amplitude vs Time"].show_envelope,
+                           envelope, title_for("Amplitude vs Time"), audio_path=audio_path)
+        
+        def show_features(data):
+            envelope, sr, S_dB, D = data
+            # D is already averaged over time
+            freqs = np.fft.rfftfreq(self.feature_cache.params['n_fft'], 1 / sr)
+            self.show_plot(self.slots["Magnitude vs Frequency"].show_line,
+                           freqs, D, title_for("Magnitude vs Frequency"), 'Frequency (Hz)', 'Magnitude',
+                           audio_path=audio_path)
+            self.show_plot(self.slots["Mel Spectrogram"].show_mel,
+                           S_dB, sr, self.feature_cache.params['hop_length'], title_for("Mel Spectrogram"),
+                           audio_path=audio_path)
+        
+        def on_error(e):
             print(f"Error processing audio file {audio_path}: {str(e)}")
+            for slot in self.slots.values():
+                slot.loading(f"Could not load {os.path.basename(audio_path)}")
+        
+        # Check if we have cached audio data
+        cached = self.audio_data.get(audio_path)
+        if cached is not None:
+            show_waveform(cached[:2])
+            show_features(cached)
+            return
+        
+        # Load the waveform first so the amplitude plot appears while features are computed
+        def waveform_loaded(data):
+            show_waveform(data)
+            self.jobs.submit(self.load_features, audio_path, data[0], on_done=show_features, on_error=on_error)
+        
+        self.jobs.submit(self.load_waveform, audio_path, on_done=waveform_loaded, on_error=on_error)
     
-    def create_amplitude_plot(self, ax, t, y):
-        ax.plot(t, y)
-        ax.set_xlabel('Time (seconds)', fontsize=10, labelpad=10)
-        ax.set_ylabel('Amplitude', fontsize=10, labelpad=10)
-        ax.tick_params(axis='both', which='major', labelsize=8)
+    def backend_ready(self, FeatureCache, FigureSlot):
+        self.feature_cache = FeatureCache()
+        self.FigureSlot = FigureSlot
+
+    def load_waveform(self, audio_path):
+        # Runs on a worker thread
+        y = self.feature_cache.load_audio(audio_path)
+        sr = self.feature_cache.params['sample_rate']
+        # Min/max envelope pyramid so the time plot draws about one point per pixel
+        return EnvelopePyramid(y, sr), sr
     
-    def create_magnitude_plot(self, ax, D, sr):
-        freqs = librosa.fft_frequencies(sr=sr)
-        ax.plot(freqs, np.mean(D, axis=1))
-        ax.set_xlabel('Frequency (Hz)', fontsize=10, labelpad=10)
-        ax.set_ylabel('Magnitude', fontsize=10, labelpad=10)
-        ax.tick_params(axis='both', which='major', labelsize=8)
+    def load_features(self, audio_path, envelope):
+        # Runs on a worker thread
+        sr = self.feature_cache.params['sample_rate']
+        # Mel spectrogram and time-averaged magnitude spectrum come from the disk cache
+        features = self.feature_cache.get(audio_path, ('mel_db', 'magnitude'), y=envelope.y)
+        S_dB = np.asarray(features['mel_db'], dtype=np.float32)
+        D = np.asarray(features['magnitude'], dtype=np.float32)
+        # Only what the plots need is kept: D is the time-averaged spectrum, not the full STFT
+        return self.audio_data.put(audio_path, (envelope, sr, S_dB, D))
     
-    def create_mel_spectrogram(self, ax, S_dB, sr):
-        img = librosa.display.specshow(S_dB, x_axis='time', y_axis='mel', sr=sr, ax=ax)
-        ax.set_xlabel('Time (seconds)', fontsize=10, labelpad=10)
-        ax.set_ylabel('Mel Frequency', fontsize=10, labelpad=10)
-        ax.tick_params(axis='both', which='major', labelsize=8)
-        plt.colorbar(img, ax=ax, format='%+2.0f dB')
+    def show_plot(self, show, *args, **kwargs):
+        # Update a pooled figure in place
+        try:
+            show(*args, **kwargs)
+        except Exception as e:
+            print(f"Error processing audio file {kwargs.get('audio_path')}: {str(e)}")
 
 def main():
     root = tk.Tk()
@@ -3,21 +3,34 @@
 #so locational data is most likely not useful for this project unless...
 #the location data might only be useful if identifying regional species
 
-import pandas as pd
-import folium
-from folium.plugins import MarkerCluster
 import os
+import sys
+import argparse
 import matplotlib.pyplot as plt
 
 # Get the project root directory
 script_dir = os.path.dirname(os.path.abspath(__file__))
 
+# Make the shared BirdClef2025 helpers importable when run as a script
+sys.path.insert(0, os.path.dirname(script_dir))
+from BirdClef2025.metadata import MetadataStore
+from BirdClef2025.location_map import MODES, build_map
+
+parser = argparse.ArgumentParser(description='Map of the bird recording locations')
+parser.add_argument('--mode', choices=MODES, default='markers')
+parser.add_argument('--cell-degrees', type=float, default=1.0, help='cell size for --mode grid')
+args = parser.parse_args()
+
 # Read the train.csv file
 train_path = os.path.join(script_dir, '../rawdata/train.csv')
 print(f"Looking for file at: {train_path}")
 
-# Read CSV and drop rows with NaN values in latitude or longitude
-df = pd.read_csv(train_path)
+# Load only the columns the map uses from the columnar copy of the CSV
+# and drop rows with NaN values in latitude or longitude
+metadata = MetadataStore(train_path)
+map_columns = ['common_name', 'scientific_name', 'collection', 'latitude', 'longitude', 'author',
+               'license', 'date', 'time', 'rating', 'type']
+df = metadata.columns([c for c in map_columns if c in metadata.column_names])
 df = df.dropna(subset=['latitude', 'longitude'])
 
 # Print some basic statistics
@@ -28,55 +41,9 @@ print("\nGeographic Distribution:")
 print(f"Latitude range: {df['latitude'].min()} to {df['latitude'].max()}")
 print(f"Longitude range: {df['longitude'].min()} to {df['longitude'].max()}")
 
-# Create a map centered at the mean of all coordinates
-m = folium.Map(
-    location=[df['latitude'].mean(), df['longitude'].mean()],
-    zoom_start=2
-)
-
-# Create a marker cluster
-marker_cluster = MarkerCluster().add_to(m)
-
-# Define colors for different collections
-collection_colors = {
-    'CSA': 'red',
-    'SSW': 'blue',
-    'ML': 'green',
-    'XC': 'purple',
-    'EBIRD': 'orange',
-    'OTHERS': 'gray'
-}
-
-# Add markers for each location
-for idx, row in df.iterrows():
-    # Get color based on collection
-    color = collection_colors.get(row['collection'], 'gray')
-    
-    # Create popup content
-    popup_content = f"""
-    <div style='font-family: Arial, sans-serif;'>
-        <h3 style='margin: 0 0 10px 0;'>{row['common_name']}</h3>
-        <p style='margin: 5px 0;'><b>Scientific Name:</b> {row['scientific_name']}</p>
-        <p style='margin: 5px 0;'><b>Collection:</b> {row['collection']}</p>
-        <p style='margin: 5px 0;'><b>Location:</b> {row['latitude']:.4f}°N, {row['longitude']:.4f}°E</p>
-        <p style='margin: 5px 0;'><b>Author:</b> {row['author']}</p>
-        <p style='margin: 5px 0;'><b>License:</b> {row['license']}</p>
-        <p style='margin: 5px 0;'><b>Date:</b> {row.get('date', 'N/A')}</p>
-        <p style='margin: 5px 0;'><b>Time:</b> {row.get('time', 'N/A')}</p>
-        <p style='margin: 5px 0;'><b>Rating:</b> {row.get('rating', 'N/A')}</p>
-        <p style='margin: 5px 0;'><b>Type:</b> {row.get('type', 'N/A')}</p>
-    </div>
-    """
-    
-    folium.CircleMarker(
-        location=[row['latitude'], row['longitude']],
-        radius=5,
-        popup=folium.Popup(popup_content, max_width=300),
-        color=color,
-        fill=True,
-        fill_color=color,
-        fill_opacity=0.7
-    ).add_to(marker_cluster)
+# Build the map: 'markers' adds one marker per recording, 'fast' ships all points in a
+# single FastMarkerCluster layer, 'grid' aggregates recordings per collection and cell
+m = build_map(df, mode=args.mode, cell_degrees=args.cell_degrees)
 
 # Save the map to an HTML file in the same directory as this script
 output_path = os.path.join(script_dir, 'bird_locations_map.html')
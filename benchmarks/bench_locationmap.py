@@ -0,0 +1,56 @@
+# Benchmark: location map generation time and HTML size per mode
+# Usage: python benchmarks/bench_locationmap.py --points 20000
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from BirdClef2025.location_map import COLLECTION_COLORS, MODES, build_map
+
+
+def synthetic_metadata(n, seed=42):
+    # train.csv-like rows spread over the globe
+    rng = np.random.default_rng(seed)
+    species = [f'Species {i}' for i in range(200)]
+    return pd.DataFrame({
+        'common_name': rng.choice([f'Bird {i}' for i in range(200)], n),
+        'scientific_name': rng.choice(species, n),
+        'collection': rng.choice(list(COLLECTION_COLORS), n),
+        'latitude': rng.uniform(-60, 70, n),
+        'longitude': rng.uniform(-180, 180, n),
+        'author': rng.choice([f'Author {i}' for i in range(500)], n),
+        'license': 'cc-by-nc-sa 4.0',
+        'rating': rng.integers(0, 6, n).astype(float),
+        'type': "['call']",
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Location map generation time and HTML size per mode')
+    parser.add_argument('--points', type=int, default=20000)
+    parser.add_argument('--loop-points', type=int, default=None,
+                        help='points for the per-row marker loop (default: same as --points)')
+    args = parser.parse_args()
+
+    df = synthetic_metadata(args.points)
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'mode':<10}{'points':>10}{'build s':>10}{'save s':>10}{'HTML MB':>10}")
+        for mode in MODES:
+            data = df.head(args.loop_points) if mode == 'markers' and args.loop_points else df
+            start = time.perf_counter()
+            m = build_map(data, mode=mode)
+            built = time.perf_counter()
+            path = os.path.join(tmp, f'{mode}.html')
+            m.save(path)
+            saved = time.perf_counter()
+            size_mb = os.path.getsize(path) / 1024 ** 2
+            print(f'{mode:<10}{len(data):>10}{built - start:>10.2f}{saved - built:>10.2f}{size_mb:>10.1f}')
+
+
+if __name__ == "__main__":
+    main()
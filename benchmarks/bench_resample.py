@@ -0,0 +1,69 @@
+# Benchmark: decode + resample throughput per resampler backend
+# Synthetic OGG files at common native rates are loaded to the configured
+# sample rate with each backend; librosa.load's default 22050 Hz is the baseline.
+# Usage: python benchmarks/bench_resample.py --seconds 60
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import librosa
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from BirdClef2025.audio_io import default_audio_settings, load_audio
+
+NATIVE_RATES = (32000, 44100, 48000)
+BACKENDS = ('polyphase', 'soxr_lq', 'soxr_hq', 'soxr_vhq')
+
+
+def write_fixture(path, rate, seconds, seed=0):
+    # Chirp plus noise so encoders and resamplers do real work
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(rate * seconds)) / rate
+    y = 0.3 * np.sin(2 * np.pi * (500 + 200 * t) * t) + 0.05 * rng.standard_normal(len(t))
+    sf.write(path, y.astype(np.float32), rate)
+
+
+def throughput(load, path, seconds, repeat):
+    # Seconds of audio decoded per wall-clock second, best of `repeat`
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        load(path)
+        best = min(best, time.perf_counter() - start)
+    return seconds / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Decode + resample throughput per resampler backend')
+    parser.add_argument('--seconds', type=float, default=60)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    target_sr = default_audio_settings()[0]
+    loaders = {'librosa.load 22050': lambda path: librosa.load(path)}
+    for backend in BACKENDS:
+        loaders[backend] = lambda path, backend=backend: load_audio(path, sr=target_sr, resampler=backend)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {}
+        for rate in NATIVE_RATES:
+            paths[rate] = os.path.join(tmp, f'fixture_{rate}.ogg')
+            write_fixture(paths[rate], rate, args.seconds)
+
+        # Warm up numba/soxr so first-call costs do not skew the table
+        for load in loaders.values():
+            load(paths[NATIVE_RATES[0]])
+
+        print(f'target rate {target_sr} Hz, audio seconds decoded per second')
+        print(f"{'backend':<20}" + ''.join(f'{rate:>10}' for rate in NATIVE_RATES))
+        for name, load in loaders.items():
+            row = [throughput(load, paths[rate], args.seconds, args.repeat) for rate in NATIVE_RATES]
+            print(f'{name:<20}' + ''.join(f'{value:>10.0f}' for value in row))
+
+
+if __name__ == "__main__":
+    main()
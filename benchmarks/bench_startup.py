@@ -0,0 +1,60 @@
+# Benchmark: import cost of the viewer and script entry points
+# Each target is imported in a fresh interpreter under `python -X importtime`;
+# the cumulative time of the target module and the heaviest dependencies it
+# pulls in are reported. The viewers should not load librosa or matplotlib
+# before the first Process click. The submission script lists files at import,
+# so it is imported from a small synthetic fixture tree.
+# Usage: python benchmarks/bench_startup.py --repeat 5
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+from benchmarks.fixtures import make_fixture
+
+HEAVY = ('librosa', 'matplotlib', 'pandas', 'scipy', 'numba', 'sklearn')
+
+
+def import_times(module, path):
+    # {module name: cumulative microseconds} for one cold import
+    code = f'import sys; sys.path.insert(0, {path!r}); import {module}'
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            capture_output=True, text=True, check=True, cwd=PROJECT_ROOT)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times.setdefault(name.strip(), int(cumulative))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import cost of the viewer and script entry points')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as fixture:
+        make_fixture(fixture, n_species=2, recordings_per_species=1, n_soundscapes=1)
+        targets = {
+            'mel_spectrogram_viewer': PROJECT_ROOT,
+            'audiovisual': os.path.join(PROJECT_ROOT, 'Explore'),
+            'BirdClef2025.notebooks.samplesubmission': fixture,
+        }
+
+        print(f"{'target':<42}{'import ms':>10}  heavy modules loaded (ms)")
+        for module, path in targets.items():
+            runs = [import_times(module, path) for _ in range(args.repeat)]
+            total = statistics.median(run[module] for run in runs) / 1000
+            heavy = ', '.join(f'{name} {statistics.median(run[name] for run in runs) / 1000:.0f}'
+                              for name in HEAVY if name in runs[0])
+            print(f'{module:<42}{total:>10.0f}  {heavy or "-"}')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# Benchmark: per-chunk pd.concat loop vs the preallocated SubmissionWriter
+# Usage: python benchmarks/bench_submission.py --soundscapes 200 --classes 206
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from BirdClef2025.submission import SubmissionWriter
+
+CHUNKS_PER_SOUNDSCAPE = 12
+
+
+def concat_loop(soundscapes, class_labels, out_path):
+    # The original samplesubmission.py approach
+    predictions = pd.DataFrame(columns=['row_id'] + class_labels)
+    for soundscape in soundscapes:
+        for i in range(CHUNKS_PER_SOUNDSCAPE):
+            row_id = soundscape + f'_{i * 5 + 5}'
+            scores = np.random.rand(len(class_labels))
+            new_row = pd.DataFrame([[row_id] + list(scores)], columns=['row_id'] + class_labels)
+            predictions = pd.concat([predictions, new_row], axis=0, ignore_index=True)
+    predictions.to_csv(out_path, index=False)
+
+
+def preallocated(soundscapes, class_labels, out_path):
+    writer = SubmissionWriter(soundscapes, class_labels,
+                              chunk_counts=[CHUNKS_PER_SOUNDSCAPE] * len(soundscapes))
+    for soundscape in soundscapes:
+        writer.fill(soundscape, np.random.rand(CHUNKS_PER_SOUNDSCAPE, len(class_labels)))
+    writer.write(out_path)
+
+
+def run(func, n_soundscapes, class_labels, out_path):
+    soundscapes = [f'soundscape_{i:06d}' for i in range(n_soundscapes)]
+    start = time.perf_counter()
+    func(soundscapes, class_labels, out_path)
+    elapsed = time.perf_counter() - start
+    rows = n_soundscapes * CHUNKS_PER_SOUNDSCAPE
+    return rows, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-chunk pd.concat loop vs the preallocated SubmissionWriter')
+    parser.add_argument('--soundscapes', type=int, default=200)
+    parser.add_argument('--classes', type=int, default=206)
+    parser.add_argument('--loop-soundscapes', type=int, default=None,
+                        help='soundscapes for the concat loop (it is quadratic, default: same as --soundscapes)')
+    args = parser.parse_args()
+
+    np.random.seed(42)
+    class_labels = [f'class_{i}' for i in range(args.classes)]
+    loop_soundscapes = args.loop_soundscapes or args.soundscapes
+
+    with tempfile.TemporaryDirectory() as tmp:
+        out_path = os.path.join(tmp, 'submission.csv')
+        print(f"{'method':<14}{'rows':>10}{'seconds':>10}{'rows/sec':>12}")
+        for name, func, n in [('concat loop', concat_loop, loop_soundscapes),
+                              ('preallocated', preallocated, args.soundscapes)]:
+            rows, elapsed = run(func, n, class_labels, out_path)
+            print(f'{name:<14}{rows:>10}{elapsed:>10.3f}{rows / elapsed:>12.0f}')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# Synthetic, reproducible project tree for the benchmarks
+# Writes rawdata/train_audio/<label>/*.ogg, rawdata/train.csv and 1-minute
+# rawdata/test_soundscapes/*.ogg made of seeded chirps over noise, and links
+# the BirdClef2025 package and config next to them so scripts that locate
+# the project root from their own path run against the fixture.
+
+import os
+import shutil
+import numpy as np
+import pandas as pd
+import soundfile as sf
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COLLECTIONS = ('XC', 'iNat', 'CSA')
+
+
+def synth_audio(rng, seconds, sr):
+    # A few bird-like frequency sweeps over pink-ish background noise
+    n = int(seconds * sr)
+    t = np.arange(n) / sr
+    noise = np.cumsum(rng.standard_normal(n)).astype(np.float32)
+    noise = 0.02 * (noise - np.convolve(noise, np.ones(64) / 64, mode='same'))
+    y = noise
+    for _ in range(max(1, int(seconds // 2))):
+        start = rng.uniform(0, max(seconds - 1, 0.1))
+        length = rng.uniform(0.1, 0.8)
+        f0, f1 = rng.uniform(1500, 8000, 2)
+        mask = (t >= start) & (t < start + length)
+        tau = t[mask] - start
+        y[mask] += 0.3 * np.sin(2 * np.pi * (f0 * tau + (f1 - f0) * tau ** 2 / (2 * length)))
+    return np.clip(y, -1, 1).astype(np.float32)
+
+
+def make_fixture(root, n_species=10, recordings_per_species=3, recording_seconds=(10, 40),
+                 n_soundscapes=5, soundscape_seconds=60, sr=32000, seed=42):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for s in range(n_species):
+        label = f'sp{s:03d}'
+        os.makedirs(os.path.join(root, 'rawdata', 'train_audio', label), exist_ok=True)
+        for r in range(recordings_per_species):
+            filename = f'{label}/XC{s * 1000 + r}.ogg'
+            seconds = rng.uniform(*recording_seconds)
+            sf.write(os.path.join(root, 'rawdata', 'train_audio', filename), synth_audio(rng, seconds, sr), sr)
+            rows.append({
+                'primary_label': label,
+                'secondary_labels': '[]',
+                'type': "['call']",
+                'filename': filename,
+                'collection': COLLECTIONS[r % len(COLLECTIONS)],
+                'rating': float(rng.integers(0, 6)),
+                'url': '',
+                'latitude': rng.uniform(-30, 15),
+                'longitude': rng.uniform(-80, -40),
+                'scientific_name': f'Avis synthetica {s}',
+                'common_name': f'Synthetic bird {s}',
+                'author': f'Author {r}',
+                'license': 'cc-by-nc-sa 4.0',
+            })
+    pd.DataFrame(rows).to_csv(os.path.join(root, 'rawdata', 'train.csv'), index=False)
+
+    os.makedirs(os.path.join(root, 'rawdata', 'test_soundscapes'), exist_ok=True)
+    for i in range(n_soundscapes):
+        path = os.path.join(root, 'rawdata', 'test_soundscapes', f'H{i:02d}_20230101_000000.ogg')
+        sf.write(path, synth_audio(rng, soundscape_seconds, sr), sr)
+
+    # Code and config from this checkout, so relative project paths resolve inside the fixture
+    for name in ('BirdClef2025', 'config'):
+        target = os.path.join(root, name)
+        if not os.path.exists(target):
+            try:
+                os.symlink(os.path.join(PROJECT_ROOT, name), target)
+            except OSError:
+                shutil.copytree(os.path.join(PROJECT_ROOT, name), target)
+    return root
@@ -0,0 +1,186 @@
+# Benchmark suite for the project's hot paths on synthetic data
+# Cases:
+#   submission  samplesubmission.py end to end, in a subprocess
+#   mel         decode + mel spectrogram per recording, as MelSpectrogramViewer does on a cold cache
+#   visualizer  AudioVisualizer.process_visualizations on a cold cache, figures rendered off-screen
+# Results are saved as JSON and can be compared against an earlier baseline.
+#
+# Usage:
+#   python benchmarks/run.py --save benchmarks/baselines/main.json
+#   python benchmarks/run.py --compare benchmarks/baselines/main.json
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+from benchmarks.fixtures import make_fixture
+from BirdClef2025.audio_io import load_audio
+from BirdClef2025.config import audio_params
+from BirdClef2025.features import FeatureEngine
+from BirdClef2025.figure_pool import FigureSlot
+
+CASES = ('submission', 'mel', 'visualizer')
+
+
+def bench_submission(root):
+    script = os.path.join(root, 'BirdClef2025', 'notebooks', 'samplesubmission.py')
+    subprocess.run([sys.executable, script], cwd=root, check=True, stdout=subprocess.DEVNULL)
+
+
+def recordings(root):
+    df = pd.read_csv(os.path.join(root, 'rawdata', 'train.csv'))
+    return [os.path.join(root, 'rawdata', 'train_audio', name) for name in df['filename']]
+
+
+def bench_mel(root):
+    engine = FeatureEngine.from_params(audio_params())
+    for path in recordings(root):
+        y, _ = load_audio(path, sr=engine.sr)
+        engine.mel_db(y)
+
+
+class SyncJobs:
+    """Stand-in for BackgroundJobs that runs each job at once on the calling thread."""
+
+    def submit(self, func, *args, on_done=None, on_error=None, cancellable=True):
+        # Errors are raised instead of handed to on_error, so a broken load path fails the benchmark
+        result = func(*args)
+        if on_done is not None:
+            on_done(result)
+
+    def cancel(self):
+        pass
+
+
+class NoButton:
+    def config(self, **kwargs):
+        pass
+
+
+def visualizer_case():
+    # AudioVisualizer's own load and show path (load_waveform, load_features,
+    # show_plot) without Tk: jobs run synchronously and its pooled figures
+    # render off-screen. The app, and so its figure pool, persists across repeats
+    # like in the GUI; the feature cache and LRU start cold on every call.
+    sys.path.insert(0, os.path.join(PROJECT_ROOT, 'Explore'))
+    from audiovisual import AudioVisualizer
+    from BirdClef2025.feature_cache import FeatureCache
+    from BirdClef2025.lru import LRUCache
+    from BirdClef2025.metadata import MetadataStore
+    app = None
+
+    def bench_visualizer(root):
+        nonlocal app
+        cwd = os.getcwd()
+        os.chdir(root)  # the viewer resolves rawdata/ relative to the working directory
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                if app is None:
+                    app = AudioVisualizer.__new__(AudioVisualizer)
+                    app.jobs = SyncJobs()
+                    app.process_button = NoButton()
+                    app.visualization_frame = None
+                    app.slots = None
+                    app.FigureSlot = lambda master, **kwargs: FigureSlot(None, **kwargs)
+                    app.metadata = MetadataStore('rawdata/train.csv', cache_dir=os.path.join(tmp, 'metadata'))
+                app.feature_cache = FeatureCache(cache_dir=os.path.join(tmp, 'features'))
+                app.audio_data = LRUCache(AudioVisualizer.CACHE_BYTES)
+                for species in app.metadata.species()[:5]:
+                    app.current_species = species
+                    app.current_recording = app.metadata.select(species, ['filename', 'scientific_name'],
+                                                                limit=1).iloc[0]
+                    app.process_visualizations()
+        finally:
+            os.chdir(cwd)
+
+    return bench_visualizer
+
+
+def measure(func, root, repeat):
+    func(root)  # warm-up: imports, filter caches, numba
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(root)
+        times.append(time.perf_counter() - start)
+    return {'best': min(times), 'median': statistics.median(times), 'repeat': repeat}
+
+
+def machine_info():
+    return {'python': platform.python_version(), 'platform': platform.platform(),
+            'processor': platform.processor(), 'cpu_count': os.cpu_count(), 'numpy': np.__version__}
+
+
+def compare(results, baseline, threshold):
+    # Ratio of current to baseline median per case; > 1 + threshold is a regression
+    regressions = []
+    print(f"{'case':<12}{'baseline s':>12}{'current s':>12}{'ratio':>8}")
+    for case, current in results['cases'].items():
+        base = baseline['cases'].get(case)
+        if base is None:
+            print(f'{case:<12}{"-":>12}{current["median"]:>12.3f}{"new":>8}')
+            continue
+        ratio = current['median'] / base['median']
+        flag = '  REGRESSION' if ratio > 1 + threshold else ''
+        print(f'{case:<12}{base["median"]:>12.3f}{current["median"]:>12.3f}{ratio:>8.2f}{flag}')
+        if flag:
+            regressions.append(case)
+    if baseline.get('machine') != results['machine']:
+        print('note: baseline was recorded on a different machine or environment')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='BirdCLEF hot path benchmarks')
+    parser.add_argument('--cases', nargs='+', choices=CASES, default=list(CASES))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--species', type=int, default=10)
+    parser.add_argument('--soundscapes', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--fixture', default=None, help='reuse or create the fixture tree here')
+    parser.add_argument('--save', default=None, help='write results JSON here')
+    parser.add_argument('--compare', default=None, help='baseline JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10, help='allowed slowdown before failing')
+    args = parser.parse_args()
+
+    funcs = {'submission': bench_submission, 'mel': bench_mel, 'visualizer': visualizer_case()}
+    with tempfile.TemporaryDirectory() as tmp:
+        root = args.fixture or tmp
+        if not os.path.exists(os.path.join(root, 'rawdata', 'train.csv')):
+            make_fixture(root, n_species=args.species, n_soundscapes=args.soundscapes, seed=args.seed)
+
+        results = {'machine': machine_info(),
+                   'fixture': {'species': args.species, 'soundscapes': args.soundscapes, 'seed': args.seed},
+                   'cases': {}}
+        for case in args.cases:
+            results['cases'][case] = measure(funcs[case], root, args.repeat)
+            r = results['cases'][case]
+            print(f'{case:<12} best {r["best"]:.3f} s  median {r["median"]:.3f} s')
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f'Results saved to {args.save}')
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,43 @@
-import pandas as pd
 import numpy as np
-import librosa
-import librosa.display
-import matplotlib.pyplot as plt
 import tkinter as tk
 from tkinter import ttk
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import os
 import subprocess
 import platform
+from BirdClef2025.lru import LRUCache
+from BirdClef2025.tk_jobs import BackendLoader, BackgroundJobs
+from BirdClef2025.metadata import MetadataStore
+from BirdClef2025.tk_gallery import ThumbnailGallery
 
 class MelSpectrogramViewer:
+    # Memory budget for spectrograms kept between species selections
+    CACHE_BYTES = 256 * 1024 ** 2
+    # Full figures per species, and thumbnails per species in gallery mode
+    RECORDINGS_PER_SPECIES = 3
+    GALLERY_SIZE = 50
+
     def __init__(self, root):
         self.root = root
         self.root.title("Bird Mel Spectrogram Viewer")
-        self.spectrograms = {}  # Cache for spectrograms
+        self.spectrograms = LRUCache(self.CACHE_BYTES)  # Cache for spectrograms
+        self.feature_cache = None  # On-disk cache shared with the other tools, created with the backend
+        self.FigureSlot = None
+        self.jobs = BackgroundJobs(root)  # Decoding and feature extraction off the Tk thread
+        self.backend = BackendLoader(self.jobs, on_ready=self.backend_ready)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.slots = []  # Figures reused across species selections
+        self.gallery = None  # Thumbnail grid, created on the first gallery view
         self.current_species = None
         self.current_recordings = None
         
         # Read the training data
         try:
-            self.df = pd.read_csv('rawdata/train.csv')
-            self.scientific_names = sorted(self.df['scientific_name'].unique())
+            # Columnar copy of train.csv with a species -> rows index, built on first use
+            self.metadata = MetadataStore('rawdata/train.csv')
+            self.scientific_names = self.metadata.species()
         except Exception as e:
             print(f"Error loading training data: {str(e)}")
-            self.df = pd.DataFrame()
+            self.metadata = None
             self.scientific_names = []
         
         # Create GUI elements
@@ -66,6 +79,15 @@ class MelSpectrogramViewer:
         self.process_button = tk.Button(control_frame, text="Process", command=self.process_spectrograms, state=tk.DISABLED)
         self.process_button.pack(side=tk.LEFT, padx=5)
         
+        # Gallery mode shows many small thumbnails; clicking one opens its full figure
+        self.gallery_var = tk.BooleanVar(value=False)
+        self.gallery_check = tk.Checkbutton(control_frame, text=f"Gallery ({self.GALLERY_SIZE})", variable=self.gallery_var)
+        self.gallery_check.pack(side=tk.LEFT, padx=5)
+        
+        # Create frame for the thumbnail gallery
+        self.gallery_frame = tk.Frame(self.scrollable_frame)
+        self.gallery_frame.pack(fill=tk.X)
+        
         # Create frame for spectrograms
         self.spectrogram_frame = tk.Frame(self.scrollable_frame)
         self.spectrogram_frame.pack(fill=tk.BOTH, expand=True)
@@ -75,6 +97,11 @@ class MelSpectrogramViewer:
         
     def _on_mousewheel(self, event):
         self.canvas.yview_scroll(int(-1*(event.delta/120)), "units")
+
+    def on_close(self):
+        # Stop background work first so closing mid-decode does not wait for queued files
+        self.jobs.shutdown()
+        self.root.destroy()
         
     def open_audio_file(self, audio_path):
         try:
@@ -88,9 +115,15 @@ class MelSpectrogramViewer:
             print(f"Error opening audio file: {str(e)}")
             
     def on_species_select(self, event):
-        # Clear previous spectrograms
-        for widget in self.spectrogram_frame.winfo_children():
-            widget.destroy()
+        # Drop spectrograms still loading for the previous species
+        self.jobs.cancel()
+
+        # Hide previous spectrograms and thumbnails
+        for slot in self.slots:
+            slot.hide()
+        if self.gallery is not None:
+            self.gallery.set_items([])
+            self.gallery.frame.pack_forget()
             
         selected_species = self.name_var.get()
         if not selected_species:
@@ -98,7 +131,7 @@ class MelSpectrogramViewer:
             
         self.current_species = selected_species
         try:
-            self.current_recordings = self.df[self.df['scientific_name'] == selected_species].head(3)
+            self.current_recordings = self.metadata.select(selected_species, ['filename', 'scientific_name'], limit=self.GALLERY_SIZE)
             if not self.current_recordings.empty:
                 self.process_button.config(state=tk.NORMAL)
             else:
@@ -111,53 +144,90 @@ class MelSpectrogramViewer:
         if not self.current_species or self.current_recordings is None or self.current_recordings.empty:
             return
             
-        # Clear previous spectrograms
-        for widget in self.spectrogram_frame.winfo_children():
-            widget.destroy()
+        # Drop jobs from an earlier click and reuse the figures of the previous view
+        self.jobs.cancel()
+        if self.feature_cache is None:
+            self.backend.load(self.process_button, self.process_spectrograms)
+            return
+        if self.gallery_var.get():
+            self.show_gallery()
+        else:
+            if self.gallery is not None:
+                self.gallery.frame.pack_forget()
+            self.show_recordings(self.current_recordings.head(self.RECORDINGS_PER_SPECIES))
+
+    def show_recordings(self, recordings):
+        # Full-size figures for the given recordings, reusing the pooled slots
+        slots = self.get_slots(len(recordings))
             
-        for idx, recording in self.current_recordings.iterrows():
-            # Create a container frame for each spectrogram and its controls
-            container = tk.Frame(self.spectrogram_frame)
-            container.pack(fill=tk.X, pady=15)
+        for slot, (idx, recording) in zip(slots, recordings.iterrows()):
+            slot.loading(f"Loading {os.path.basename(recording['filename'])}...")
             
-            # Load and process the audio file
+            # Load and process the audio file in the background, draw it when ready
             audio_path = os.path.join('rawdata', 'train_audio', recording['filename'])
-            try:
-                # Check if we have cached spectrogram data
-                if audio_path not in self.spectrograms:
-                    y, sr = librosa.load(audio_path)
-                    S = librosa.feature.melspectrogram(y=y, sr=sr)
-                    S_dB = librosa.power_to_db(S, ref=np.max)
-                    self.spectrograms[audio_path] = (y, sr, S_dB)
-                else:
-                    y, sr, S_dB = self.spectrograms[audio_path]
-                
-                # Create a new figure for each spectrogram
-                fig, ax = plt.subplots(figsize=(9, 5))
-                
-                # Display the spectrogram
-                img = librosa.display.specshow(S_dB, x_axis='time', y_axis='mel', sr=sr, ax=ax)
-                ax.set_title(f'{recording["scientific_name"]} - {os.path.basename(recording["filename"])}', pad=20)
-                ax.set_xlabel('Time (seconds)', fontsize=10, labelpad=10)
-                ax.set_ylabel('Mel Frequency', fontsize=10, labelpad=10)
-                ax.tick_params(axis='both', which='major', labelsize=8)
-                fig.colorbar(img, ax=ax, format='%+2.0f dB')
-                
-                # Adjust layout to prevent label cutoff
-                plt.tight_layout()
-                
-                # Create canvas and add to frame
-                canvas = FigureCanvasTkAgg(fig, master=container)
-                canvas.draw()
-                canvas.get_tk_widget().pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-                
-                # Add play button that opens the audio file
-                play_button = tk.Button(container, text="Play Audio", 
-                                      command=lambda path=audio_path: self.open_audio_file(path))
-                play_button.pack(side=tk.RIGHT, padx=10)
-                
-            except Exception as e:
-                print(f"Error processing audio file {audio_path}: {str(e)}")
+            self.jobs.submit(
+                self.load_spectrogram, audio_path,
+                on_done=lambda data, s=slot, r=recording, path=audio_path: self.show_spectrogram(s, r, path, data),
+                on_error=lambda e, s=slot, path=audio_path: self.show_error(s, path, e))
+
+    def show_gallery(self):
+        for slot in self.slots:
+            slot.hide()
+        if self.gallery is None:
+            self.gallery = ThumbnailGallery(self.gallery_frame, request_tile=self.request_thumbnail,
+                                            on_open=self.open_thumbnail)
+        self.gallery.frame.pack(fill=tk.X, pady=10)
+        # Tiles are requested as they scroll into view
+        self.gallery.set_items([os.path.basename(name) for name in self.current_recordings['filename']])
+
+    def request_thumbnail(self, index):
+        audio_path = os.path.join('rawdata', 'train_audio', self.current_recordings['filename'].iloc[index])
+        self.jobs.submit(
+            self.feature_cache.thumbnail, audio_path,
+            on_done=lambda rgb, i=index: self.gallery.set_tile(i, rgb),
+            on_error=lambda e, path=audio_path: print(f"Error processing audio file {path}: {str(e)}"))
+
+    def open_thumbnail(self, index):
+        # The full-resolution figure is only made for the clicked tile
+        self.show_recordings(self.current_recordings.iloc[[index]])
+
+    def backend_ready(self, FeatureCache, FigureSlot):
+        self.feature_cache = FeatureCache()
+        self.FigureSlot = FigureSlot
+
+    def get_slots(self, n):
+        # Grow the figure pool as needed and show the first n figures in order
+        while len(self.slots) < n:
+            self.slots.append(self.FigureSlot(self.spectrogram_frame, on_play=self.open_audio_file))
+        for slot in self.slots:
+            slot.hide()
+        for slot in self.slots[:n]:
+            slot.attach()
+        return self.slots[:n]
+
+    def load_spectrogram(self, audio_path):
+        # Runs on a worker thread
+        # Check if we have cached spectrogram data
+        cached = self.spectrograms.get(audio_path)
+        if cached is None:
+            S_dB = np.asarray(self.feature_cache.get(audio_path)['mel_db'], dtype=np.float32)
+            sr = self.feature_cache.params['sample_rate']
+            cached = self.spectrograms.put(audio_path, (sr, S_dB))
+        return cached
+
+    def show_error(self, slot, audio_path, error):
+        print(f"Error processing audio file {audio_path}: {str(error)}")
+        slot.loading(f"Could not load {os.path.basename(audio_path)}")
+
+    def show_spectrogram(self, slot, recording, audio_path, data):
+        sr, S_dB = data
+        try:
+            # Update the pooled figure in place
+            slot.show_mel(S_dB, sr, self.feature_cache.params['hop_length'],
+                          f'{recording["scientific_name"]} - {os.path.basename(recording["filename"])}',
+                          audio_path=audio_path)
+        except Exception as e:
+            print(f"Error processing audio file {audio_path}: {str(e)}")
 
 def main():
     root = tk.Tk()
@@ -0,0 +1,43 @@
+import numpy as np
+
+from BirdClef2025.batching import ChunkBatcher, batch_soundscapes, chunk_signal, score_batches
+
+
+def test_chunk_signal_pads_only_the_tail():
+    full, tail = chunk_signal(np.arange(11, dtype=np.float32), 4)
+    np.testing.assert_array_equal(full, [[0, 1, 2, 3], [4, 5, 6, 7]])
+    np.testing.assert_array_equal(tail, [[8, 9, 10, 0]])
+    assert chunk_signal(np.arange(8), 4)[1] is None
+
+
+def test_segments_follow_chunks_across_batch_boundaries():
+    # 3 + 4 + 2 chunks in batches of 4
+    sources = [('s1', 3), ('s2', 4), ('s3', 2)]
+    chunks = {key: np.arange(n, dtype=np.float32)[:, None] + 10 * i for i, (key, n) in enumerate(sources)}
+    batches = list(batch_soundscapes(chunks.items(), 4, (1,)))
+
+    assert [batch.segments for batch in batches] == [
+        [('s1', 0, 3), ('s2', 0, 1)],
+        [('s2', 1, 3), ('s3', 0, 1)],
+        [('s3', 1, 1)],
+    ]
+    assert [batch.n_valid for batch in batches] == [4, 4, 1]
+    # Rows past n_valid in the last batch are zeros
+    np.testing.assert_array_equal(batches[-1].data[1:], 0)
+
+
+def test_chunk_signal_pair_keeps_chunk_numbers():
+    batcher = ChunkBatcher(3, (2,))
+    sig = np.arange(9, dtype=np.float32)
+    batches = list(batcher.add('s1', chunk_signal(sig, 2), first_chunk=1)) + list(batcher.flush())
+    # Four full chunks plus the padded tail, numbered from first_chunk
+    assert [batch.segments for batch in batches] == [[('s1', 1, 3)], [('s1', 4, 2)]]
+    np.testing.assert_array_equal(batches[1].data[1], [8, 0])
+
+
+def test_score_batches_hands_back_rows_per_segment():
+    chunks = {'s1': np.zeros((3, 1)), 's2': np.ones((2, 1))}
+    received = []
+    score_batches(batch_soundscapes(chunks.items(), 4, (1,)), lambda data: data[:, 0] + np.arange(len(data)),
+                  lambda key, scores, first: received.append((key, first, scores.tolist())))
+    assert received == [('s1', 0, [0, 1, 2]), ('s2', 0, [4]), ('s2', 1, [1])]
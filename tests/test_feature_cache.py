@@ -0,0 +1,46 @@
+import numpy as np
+import soundfile as sf
+
+from BirdClef2025.batching import chunk_signal
+from BirdClef2025.feature_cache import FeatureCache
+from BirdClef2025.features import FeatureEngine
+
+PARAMS = {'sample_rate': 32000, 'n_mels': 128, 'hop_length': 512, 'n_fft': 2048}
+
+
+def write_soundscape(path, seconds=12.3, sr=32000):
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * sr)) / sr
+    # Loudness changes across chunks so a file-wide dB reference would show
+    y = 0.05 * rng.standard_normal(len(t)) * (1 + 9 * (t > 6)) + 0.3 * np.sin(2 * np.pi * 2000 * t) * (t < 3)
+    sf.write(path, y.astype(np.float32), sr)
+    return y.astype(np.float32)
+
+
+def expected_chunks(y):
+    # What predict_batch gets when it runs the engine on the 'audio' model input
+    engine = FeatureEngine.from_params(PARAMS)
+    full, tail = chunk_signal(y, PARAMS['sample_rate'] * 5)
+    return np.concatenate([engine.mel_db(full), engine.mel_db(tail)])
+
+
+def test_mel_chunks_match_per_chunk_engine(tmp_path):
+    path = str(tmp_path / 'soundscape.wav')
+    write_soundscape(path)
+    cache = FeatureCache(str(tmp_path / 'cache'), PARAMS, dtype=np.float32)
+    expected = expected_chunks(sf.read(path, dtype='float32')[0])
+
+    cold = cache.mel_chunks(path)
+    warm = cache.mel_chunks(path)
+    assert cold.shape == (3, 128, 1 + 160000 // 512)
+    np.testing.assert_allclose(cold, expected, atol=1e-4)
+    np.testing.assert_array_equal(warm, cold)
+
+
+def test_mel_chunks_float16_cache_within_quantization(tmp_path):
+    path = str(tmp_path / 'soundscape.wav')
+    write_soundscape(path)
+    cache = FeatureCache(str(tmp_path / 'cache'), PARAMS)
+    expected = expected_chunks(sf.read(path, dtype='float32')[0])
+    # float16 steps are 1/16 dB at the bottom of the 80 dB range
+    assert np.abs(cache.mel_chunks(path) - expected).max() <= 0.04
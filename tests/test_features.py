@@ -0,0 +1,17 @@
+import librosa
+import numpy as np
+import pytest
+
+from BirdClef2025.features import FeatureEngine, mel_frequencies
+
+
+@pytest.mark.parametrize('n_mels, fmax', [(128, 16000), (64, 11025), (40, 800)])
+def test_mel_frequencies_match_librosa(n_mels, fmax):
+    np.testing.assert_allclose(mel_frequencies(n_mels=n_mels, fmax=fmax),
+                               librosa.mel_frequencies(n_mels=n_mels, fmax=fmax), rtol=1e-10)
+
+
+def test_mel_db_matches_librosa():
+    y = np.random.default_rng(0).standard_normal(32000).astype(np.float32)
+    expected = librosa.power_to_db(librosa.feature.melspectrogram(y=y, sr=32000), ref=np.max)
+    np.testing.assert_allclose(FeatureEngine(32000).mel_db(y), expected, atol=1e-3)
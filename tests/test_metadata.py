@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from BirdClef2025.metadata import MetadataStore
+
+
+def write_train_csv(path):
+    species = ['Turdus merula', 'Parus major', 'Erithacus rubecula']
+    pd.DataFrame({
+        'filename': [f'rec{i}.ogg' for i in range(30)],
+        'scientific_name': [species[i % 3] for i in range(30)],
+        'collection': ['XC' if i % 4 else 'iNat' for i in range(30)],
+        'rating': np.arange(30) % 5,
+    }).to_csv(path, index=False)
+
+
+def test_repeated_strings_become_categoricals(tmp_path):
+    csv_path = str(tmp_path / 'train.csv')
+    write_train_csv(csv_path)
+    store = MetadataStore(csv_path, cache_dir=str(tmp_path / 'metadata'))
+    df = store.columns(['filename', 'scientific_name', 'collection', 'rating'])
+    assert isinstance(df['scientific_name'].dtype, pd.CategoricalDtype)
+    assert isinstance(df['collection'].dtype, pd.CategoricalDtype)
+    # Unique per row, so not worth a categorical
+    assert not isinstance(df['filename'].dtype, pd.CategoricalDtype)
+
+
+def test_select_rows_of_one_species(tmp_path):
+    csv_path = str(tmp_path / 'train.csv')
+    write_train_csv(csv_path)
+    store = MetadataStore(csv_path, cache_dir=str(tmp_path / 'metadata'))
+    assert store.species() == ['Erithacus rubecula', 'Parus major', 'Turdus merula']
+    selected = store.select('Parus major', ['filename', 'collection'], limit=3)
+    assert selected['filename'].tolist() == ['rec1.ogg', 'rec4.ogg', 'rec7.ogg']
+    assert selected.index.tolist() == [1, 4, 7]
+    assert len(store.select('Unknown', ['filename'])) == 0
@@ -0,0 +1,72 @@
+import numpy as np
+import soundfile as sf
+
+from BirdClef2025.extract_features import MelStore
+from BirdClef2025.feature_cache import FeatureCache
+from BirdClef2025.store import ShardedStore, build_store
+
+PARAMS = {'sample_rate': 32000, 'n_mels': 128, 'hop_length': 512, 'n_fft': 2048}
+
+
+def test_reopen_without_dtype_keeps_entries(tmp_path):
+    root = str(tmp_path / 'store')
+    store = ShardedStore(root, params=PARAMS, dtype='float32')
+    store.add('a.ogg', np.ones((4, 10)))
+    store.flush()
+
+    reopened = ShardedStore(root, params=PARAMS)
+    assert reopened.dtype == np.float32
+    assert reopened.get('a.ogg').shape == (4, 10)
+    # A writer asking for another dtype starts over
+    assert 'a.ogg' not in ShardedStore(root, params=PARAMS, dtype='float16')
+
+
+def no_decode(audio_path):
+    raise AssertionError(f'{audio_path} was decoded although its mel is stored')
+
+
+def test_feature_cache_reads_extracted_mels(tmp_path, monkeypatch):
+    audio_dir = tmp_path / 'train_audio'
+    (audio_dir / 'sp1').mkdir(parents=True)
+    path = str(audio_dir / 'sp1' / 'rec.wav')
+    sf.write(path, np.zeros(32000, dtype=np.float32), 32000)
+
+    mel = np.random.default_rng(0).standard_normal((128, 63)).astype(np.float16)
+    writer = MelStore(str(tmp_path / 'mel'), audio_dir=str(audio_dir), params=PARAMS)
+    writer.store.add('sp1/rec.wav', mel, source_path=path)
+    writer.store.flush()
+
+    cache = FeatureCache(str(tmp_path / 'cache'), PARAMS,
+                         mel_store=MelStore(str(tmp_path / 'mel'), audio_dir=str(audio_dir)))
+    monkeypatch.setattr(cache, 'load_audio', no_decode)
+    np.testing.assert_array_equal(cache.get(path)['mel_db'], mel)
+
+    # Other parameters than the store was built with fall back to computing
+    other = FeatureCache(str(tmp_path / 'cache'), dict(PARAMS, n_mels=64),
+                         mel_store=MelStore(str(tmp_path / 'mel'), audio_dir=str(audio_dir)))
+    assert other.get(path)['mel_db'].shape[0] == 64
+
+
+def fake_extract(path):
+    # Module level so the build pool's worker processes can unpickle it
+    if path.endswith('bad.ogg'):
+        return ValueError('cannot decode')
+    return np.full((2, 3), len(path), dtype=np.float32)
+
+
+def test_build_store_skips_failures_and_resumes(tmp_path):
+    audio_dir = tmp_path / 'train_audio'
+    audio_dir.mkdir()
+    names = ['a.ogg', 'bad.ogg', 'b.ogg']
+    for name in names:
+        (audio_dir / name).write_bytes(b'x')
+    store = ShardedStore(str(tmp_path / 'store'), params=PARAMS)
+
+    assert build_store(store, names, str(audio_dir), fake_extract, 'extract', workers=1) == ['bad.ogg']
+    assert sorted(store.entries) == ['a.ogg', 'b.ogg']
+    assert store.get('a.ogg').shape == (2, 3)
+
+    # Only the failed file is tried again
+    reopened = ShardedStore(str(tmp_path / 'store'), params=PARAMS)
+    assert build_store(reopened, names, str(audio_dir), fake_extract, 'extract', workers=1) == ['bad.ogg']
+    assert len(reopened.manifest['shards']) == 1
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+import soundfile as sf
+
+from BirdClef2025.audio_io import RESAMPLERS, load_audio
+from BirdClef2025.batching import chunk_signal
+from BirdClef2025.streaming import stream_batches, stream_frames
+
+
+def write_soundscape(path, seconds, sr):
+    rng = np.random.default_rng(0)
+    sf.write(path, (0.2 * rng.standard_normal((int(seconds * sr), 2))).astype(np.float32), sr)
+
+
+def streamed(path, **kwargs):
+    frames = list(stream_frames(path, sr=32000, **kwargs))
+    assert [i for i, _ in frames] == list(range(len(frames)))
+    return np.stack([frame for _, frame in frames])
+
+
+def expected_chunks(path, resampler=None):
+    y, sr = load_audio(path, sr=32000, resampler=resampler)
+    full, tail = chunk_signal(y, sr * 5)
+    return np.concatenate([full] + ([] if tail is None else [tail]))
+
+
+def test_native_rate_frames_match_load_audio(tmp_path):
+    path = str(tmp_path / 'soundscape.wav')
+    write_soundscape(path, 12.3, 32000)
+    np.testing.assert_array_equal(streamed(path), expected_chunks(path))
+
+
+@pytest.mark.parametrize('resampler', RESAMPLERS)
+def test_resampled_frames_match_load_audio(tmp_path, resampler):
+    path = str(tmp_path / 'soundscape.wav')
+    write_soundscape(path, 12.3, 44100)
+    np.testing.assert_array_equal(streamed(path, resampler=resampler), expected_chunks(path, resampler))
+
+
+def test_offset_and_unpadded_tail(tmp_path):
+    path = str(tmp_path / 'soundscape.wav')
+    write_soundscape(path, 12.3, 32000)
+    frames = list(stream_frames(path, offset=7.0, pad=False, sr=32000))
+    assert [i for i, _ in frames] == [1, 2]
+    assert len(frames[-1][1]) == int(2.3 * 32000)
+
+
+def test_stream_batches_route_frames_to_files(tmp_path):
+    paths = [str(tmp_path / 'a.wav'), str(tmp_path / 'b.wav')]
+    write_soundscape(paths[0], 12.3, 32000)
+    write_soundscape(paths[1], 5.0, 32000)
+    batches = list(stream_batches(paths, 2, sr=32000))
+    assert [batch.segments for batch in batches] == [[(paths[0], 0, 2)], [(paths[0], 2, 1), (paths[1], 0, 1)]]
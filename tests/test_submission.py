@@ -0,0 +1,85 @@
+import os
+
+import numpy as np
+import pytest
+
+from BirdClef2025.submission import IncrementalSubmission, ScoreCheckpoint, SubmissionWriter
+
+LABELS = ['a1', 'b2', 'c3']
+SOUNDSCAPES = ['/data/sc1.ogg', '/data/sc2.ogg', '/data/sc3.ogg']
+COUNTS = [3, 0, 2]
+
+
+def scores(n, seed):
+    return np.random.default_rng(seed).random((n, len(LABELS)), dtype=np.float32)
+
+
+def test_checkpoint_drops_torn_record(tmp_path):
+    path = str(tmp_path / 'scores.ckpt')
+    checkpoint = ScoreCheckpoint(path, LABELS)
+    checkpoint.append('sc1', scores(3, 0))
+    checkpoint.append('sc3', scores(2, 1))
+    checkpoint.close()
+    # A crash in the middle of the second record
+    with open(path, 'r+b') as f:
+        f.truncate(os.path.getsize(path) - 5)
+
+    reopened = ScoreCheckpoint(path, LABELS)
+    assert 'sc1' in reopened and 'sc3' not in reopened
+    np.testing.assert_array_equal(reopened.read('sc1'), scores(3, 0))
+    # The torn bytes are overwritten by the next record
+    reopened.append('sc3', scores(2, 2))
+    reopened.close()
+    again = ScoreCheckpoint(path, LABELS)
+    np.testing.assert_array_equal(again.read('sc3'), scores(2, 2))
+    again.close()
+
+
+def test_checkpoint_restarts_on_other_labels(tmp_path):
+    path = str(tmp_path / 'scores.ckpt')
+    checkpoint = ScoreCheckpoint(path, LABELS)
+    checkpoint.append('sc1', scores(3, 0))
+    checkpoint.close()
+
+    relabelled = ScoreCheckpoint(path, LABELS + ['d4'])
+    assert len(relabelled.entries) == 0
+    relabelled.append('sc1', np.ones((3, 4)))
+    relabelled.close()
+    assert ScoreCheckpoint(path, LABELS + ['d4']).n_rows('sc1') == 3
+
+
+def test_resumed_submission_matches_writer(tmp_path):
+    checkpoint_path = str(tmp_path / 'scores.ckpt')
+    first = IncrementalSubmission(SOUNDSCAPES, LABELS, checkpoint_path, chunk_counts=COUNTS)
+    assert first.remaining == ['/data/sc1.ogg', '/data/sc3.ogg']
+    first.fill('/data/sc1.ogg', scores(3, 0))
+    first.fill('/data/sc3.ogg', scores(1, 1), first_chunk=1)
+    first.close()
+
+    # Restart: sc1 is restored from the checkpoint, the half-scored sc3 is redone
+    resumed = IncrementalSubmission(SOUNDSCAPES, LABELS, checkpoint_path, chunk_counts=COUNTS)
+    assert resumed.remaining == ['/data/sc3.ogg']
+    resumed.fill('/data/sc3.ogg', scores(2, 1))
+    assert resumed.remaining == []
+    resumed.write(str(tmp_path / 'incremental.csv'))
+    resumed.close(remove=True)
+    assert not os.path.exists(checkpoint_path)
+
+    writer = SubmissionWriter(SOUNDSCAPES, LABELS, chunk_counts=COUNTS)
+    writer.fill('/data/sc1.ogg', scores(3, 0))
+    writer.fill('/data/sc3.ogg', scores(2, 1))
+    writer.write(str(tmp_path / 'writer.csv'))
+    with open(tmp_path / 'incremental.csv', 'rb') as a, open(tmp_path / 'writer.csv', 'rb') as b:
+        assert a.read() == b.read()
+
+
+def test_refilled_chunk_is_not_counted_twice(tmp_path):
+    submission = IncrementalSubmission(SOUNDSCAPES, LABELS, str(tmp_path / 'scores.ckpt'), chunk_counts=COUNTS)
+    for _ in range(3):
+        submission.fill('/data/sc1.ogg', scores(1, 0), first_chunk=0)
+    assert '/data/sc1.ogg' in submission.remaining
+    submission.fill('/data/sc1.ogg', scores(2, 1), first_chunk=1)
+    assert '/data/sc1.ogg' not in submission.remaining
+    with pytest.raises(RuntimeError):
+        submission.write(str(tmp_path / 'submission.csv'))
+    submission.close()
@@ -0,0 +1,70 @@
+import time
+
+from BirdClef2025 import tk_jobs
+from BirdClef2025.tk_jobs import BackendLoader, BackgroundJobs
+
+
+class FakeRoot:
+    # Runs root.after callbacks when run() is called, in place of a Tk mainloop
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, func):
+        self.scheduled.append(func)
+
+    def run(self, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while self.scheduled and time.monotonic() < deadline:
+            self.scheduled.pop(0)()
+            time.sleep(0.001)
+
+
+class FakeButton:
+    def __init__(self):
+        self.text = "Process"
+
+    def config(self, state=None, text=None):
+        self.text = text
+
+
+def test_failing_callback_does_not_stop_delivery():
+    root = FakeRoot()
+    jobs = BackgroundJobs(root)
+    results = []
+    jobs.submit(lambda: 1, on_done=lambda value: 1 / 0)
+    jobs.submit(lambda: 2, on_done=results.append)
+    root.run()
+    assert results == [2]
+
+
+def test_cancel_drops_results_of_older_generations():
+    root = FakeRoot()
+    jobs = BackgroundJobs(root)
+    results = []
+    jobs.submit(time.sleep, 0.05, on_done=lambda _: results.append('old'))
+    jobs.cancel()
+    jobs.submit(lambda: 'new', on_done=results.append)
+    root.run()
+    assert results == ['new']
+
+
+def slow_import():
+    time.sleep(0.05)
+    return 'FeatureCache', 'FigureSlot'
+
+
+def test_backend_import_survives_species_change(monkeypatch):
+    monkeypatch.setattr(tk_jobs, 'import_backend', slow_import)
+    root = FakeRoot()
+    jobs = BackgroundJobs(root)
+    ready, continued = [], []
+    loader = BackendLoader(jobs, on_ready=lambda *backend: ready.append(backend))
+    button = FakeButton()
+
+    loader.load(button, lambda: continued.append(True))
+    loader.load(button, lambda: continued.append(True))  # second click while loading is ignored
+    assert button.text == "Loading..."
+    jobs.cancel()  # another species picked meanwhile
+    root.run()
+    assert ready == [('FeatureCache', 'FigureSlot')]
+    assert continued == [] and button.text == "Process" and not loader.loading